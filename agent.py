@@ -1,10 +1,17 @@
 import pygame
 import random
-import math
-import time
+from itertools import islice
 from config import CELL_SIZE, GRID_WIDTH, GRID_HEIGHT, BLUE, YELLOW
-from map import find_nearest_safe_zone  # used in guidance
-from pathfinding import a_star           # used for full route planning
+from map import text_glyph                                          # cached label surfaces
+from pathfinding import find_path, exit_field, IncrementalPlanner   # route planning and guidance
+from visibility import sight_window, sight_towards, base_by_steps, ray_table   # one-pass sight fields
+from spatial_index import SpatialIndex                             # nearest-victim queries
+from sensor_report import SensorReport                             # array-backed observations
+from summed_area import region_counts                              # O(1) window counts
+import numpy as np
+
+# Victims whose sight is checked together while looking for the nearest visible one.
+SIGHT_BATCH = 16
 
 def move_towards(x, y, tx, ty, max_steps):
     """
@@ -38,6 +45,7 @@ class Agent:
         self.guiding_speed = max(1, speed - 1)                  # Reduced speed when guiding
         self.mode = mode                                        # "autonomous" or "ordered"
         self.current_task = None                                # Task assigned by a Commander (if any)
+        self.planner = None                                     # Incremental planner for current_task
 
     def move(self, target, layers):
         """
@@ -62,20 +70,23 @@ class Agent:
                 break
 
     def render(self, screen):
+        """
+        Draws the agent and its labels; returns the Rect covering everything drawn.
+        """
         if not self.alive or self.remaining_life <= 0:
-            return
-        pygame.draw.circle(
+            return None
+        rect = pygame.draw.circle(
             screen,
             BLUE,
             (self.x * CELL_SIZE + CELL_SIZE // 2, self.y * CELL_SIZE + CELL_SIZE // 2),
             10
         )
-        font = pygame.font.SysFont(None, 18)
-        life_text = font.render(f"{self.remaining_life}%", True, (0, 0, 0))
-        screen.blit(life_text, (self.x * CELL_SIZE, self.y * CELL_SIZE - 10))
+        life_text = text_glyph(f"{self.remaining_life}%", (0, 0, 0))
+        rect = rect.union(screen.blit(life_text, (self.x * CELL_SIZE, self.y * CELL_SIZE - 10)))
         if self.guided_victims:
-            guide_text = font.render(f"Guiding {len(self.guided_victims)}", True, (255, 255, 255))
-            screen.blit(guide_text, (self.x * CELL_SIZE, self.y * CELL_SIZE + 10))
+            guide_text = text_glyph(f"Guiding {len(self.guided_victims)}", (255, 255, 255))
+            rect = rect.union(screen.blit(guide_text, (self.x * CELL_SIZE, self.y * CELL_SIZE + 10)))
+        return rect
 
     def get_effective_sight(self, target, layers):
         dx = target[0] - self.x
@@ -88,38 +99,58 @@ class Agent:
         for i in range(1, steps):
             inter_x = self.x + round(i * dx / steps)
             inter_y = self.y + round(i * dy / steps)
-            obs = layers["sight"][inter_x][inter_y]
+            obs = int(layers["sight"][inter_x][inter_y])
             if obs > max_obstruction:
                 max_obstruction = obs
         effective = max(0, base * (1 - max_obstruction))
         return effective
 
-    def rescue_victim(self, layers, victims):
+    def visible_cells(self, layers, radius=None):
+        """
+        get_effective_sight for every map cell within radius (Chebyshev, default
+        sight_distance) in one pass. Returns (cells, effective) arrays.
+        """
+        radius = self.sight_distance if radius is None else radius
+        cells, steps, obstruction = sight_window(layers["sight"], (self.x, self.y), radius)
+        base = base_by_steps(self.base_sight, self.sight_distance, radius)[steps]
+        return cells, np.maximum(0, base * (1 - obstruction))
+
+    def sight_towards(self, targets, layers):
+        """
+        get_effective_sight for a list of target cells, computed together.
+        """
+        steps, obstruction = sight_towards(layers["sight"], (self.x, self.y), targets)
+        base = base_by_steps(self.base_sight, self.sight_distance, int(steps.max(initial=0)))[steps]
+        return np.maximum(0, base * (1 - obstruction))
+
+    def rescue_victim(self, layers, victims, index=None):
         """
         In autonomous mode, scans for the nearest non-rescued victim (not being guided)
         within effective sight. Uses A* to compute a full route to bypass obstacles/hazards
         and moves one step along that route. When adjacent, adds the victim to guided_victims,
         sets victim.being_guided to True, and begins guiding the victim toward safety.
         In ordered mode, follows current_task.
+        index is an up-to-date SpatialIndex of victims; without one, a throwaway is built.
         """
         if not self.alive or self.remaining_life <= 0:
             return
         if self.mode == "ordered":
             self.follow_task(layers)
             return
-        min_dist = math.inf
+        if index is None:
+            index = SpatialIndex(victims)
         candidate = None
-        for victim in victims:
-            if not victim.rescued and not victim.being_guided:
-                effective = self.get_effective_sight((victim.x, victim.y), layers)
-                if effective > 35:
-                    d = abs(victim.x - self.x) + abs(victim.y - self.y)
-                    if d < min_dist:
-                        min_dist = d
-                        candidate = victim
+        # Victims come nearest first; sight is checked a batch at a time until one is visible.
+        waiting = index.nearest(self.x, self.y, where=lambda victim: not victim.rescued and not victim.being_guided)
+        while candidate is None:
+            batch = list(islice(waiting, SIGHT_BATCH))
+            if not batch:
+                break
+            sight = self.sight_towards([(victim.x, victim.y) for victim in batch], layers)
+            candidate = next((victim for victim, effective in zip(batch, sight.tolist()) if effective > 35), None)
         if candidate is not None:
-            # Compute full route using A* to bypass obstacles
-            route = a_star(layers["obstacles"], (self.x, self.y), (candidate.x, candidate.y), agent_mode=True)
+            # Compute full route using (cached) A* to bypass obstacles
+            route = find_path(layers, (self.x, self.y), (candidate.x, candidate.y), agent_mode=True)
             if route and len(route) > 0:
                 next_step = route.pop(0)
                 self.move(next_step, layers)
@@ -130,6 +161,7 @@ class Agent:
                     print(f"Agent at ({self.x},{self.y}) now guiding victim at ({candidate.x},{candidate.y})")
                 self.guide_victims(layers)
                 candidate.x, candidate.y = self.x, self.y
+                index.update(candidate)
                 if layers["safety"][self.x][self.y] == 1:
                     candidate.rescued = True
                     print(f"Victim rescued at ({self.x},{self.y})")
@@ -139,20 +171,21 @@ class Agent:
     def follow_task(self, layers):
         """
         Follows the current task assigned by a Commander.
-        The task should contain a 'target' coordinate (destination) and a 'route'
-        which is a full route computed (via A*) that bypasses obstacles and hazards.
-        If the next step in the route becomes blocked, the route is recalculated.
+        The task should contain a 'target' coordinate (destination). The route to it is
+        kept by an incremental (D* Lite) planner that weighs hazards and sight and, like
+        the Commander's routes, uses agent_mode; when the map changes, it repairs only the
+        part of its search that was affected.
         """
         if self.current_task is None:
             return
         target = self.current_task.get('target')  # target coordinate (x,y)
-        route = self.current_task.get('route')
-        if not route or len(route) == 0 or layers["obstacles"][route[0][0]][route[0][1]] == 1:
-            route = a_star(layers["obstacles"], (self.x, self.y), target, agent_mode=True)
-            if route is None:
-                self.current_task = None
-                return
-            self.current_task['route'] = route
+        if self.planner is None or self.planner.goal != target:
+            self.planner = IncrementalPlanner(target, agent_mode=True, weighted=True)
+        route = self.planner.plan((self.x, self.y), layers)
+        if not route:
+            self.current_task = None
+            return
+        self.current_task['route'] = route
         next_step = route.pop(0)
         self.move(next_step, layers)
         if not route:
@@ -161,16 +194,12 @@ class Agent:
     def guide_victims(self, layers):
         """
         Guides all currently guided victims toward a safety zone.
-        Uses guiding_speed for movement. Computes an exit route using A*.
+        Uses guiding_speed for movement. Steps along the exit distance field.
         Updates all guided victims' positions to match the agent's new position.
         Once a safety zone is reached, marks victims as rescued and clears guided_victims.
         """
-        exit_zone = find_nearest_safe_zone(layers["safety"], self.x, self.y)
-        if exit_zone is None:
-            return
-        route = a_star(layers["obstacles"], (self.x, self.y), exit_zone, agent_mode=True)
-        if route and len(route) > 0:
-            next_step = route[0]
+        next_step = exit_field(layers).next_step((self.x, self.y))
+        if next_step is not None:
             self.move(next_step, layers)
             for victim in self.guided_victims:
                 victim.x, victim.y = self.x, self.y
@@ -187,18 +216,17 @@ class Agent:
         """
         if not self.alive or self.remaining_life <= 0:
             return
-        safety_positions = []
-        for dx in range(-self.sight_distance, self.sight_distance + 1):
-            for dy in range(-self.sight_distance, self.sight_distance + 1):
-                nx = self.x + dx
-                ny = self.y + dy
-                if 0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT:
-                    if layers["safety"][nx][ny] == 1:
-                        safety_positions.append((nx, ny))
-        if safety_positions:
-            nearest = min(safety_positions, key=lambda t: abs(t[0]-self.x) + abs(t[1]-self.y))
-            dir_x = self.x - nearest[0]
-            dir_y = self.y - nearest[1]
+        reach = self.sight_distance
+        # The window is only read when the summed-area count says it holds safety cells;
+        # its safety cells then come straight from the clipped slice, in x-major order.
+        if region_counts(layers, "safety").count(self.x - reach, self.y - reach, self.x + reach, self.y + reach):
+            x0, y0 = max(self.x - reach, 0), max(self.y - reach, 0)
+            window = layers["safety"][x0:self.x + reach + 1, y0:self.y + reach + 1]
+            safety_positions = np.argwhere(window == 1) + (x0, y0)
+            # argmin keeps the first of equally near cells, like a scan would.
+            nearest = safety_positions[np.abs(safety_positions - (self.x, self.y)).sum(axis=1).argmin()]
+            dir_x = self.x - int(nearest[0])
+            dir_y = self.y - int(nearest[1])
             move_x = 1 if dir_x > 0 else -1 if dir_x < 0 else 0
             move_y = 1 if dir_y > 0 else -1 if dir_y < 0 else 0
             candidate = (self.x + move_x, self.y + move_y)
@@ -225,22 +253,9 @@ class Agent:
         """
         if not self.alive or self.remaining_life <= 0:
             return
-        safety_targets = []
-        hazard_visible = False
-        for dx in range(-self.sight_distance, self.sight_distance + 1):
-            for dy in range(-self.sight_distance, self.sight_distance + 1):
-                nx = self.x + dx
-                ny = self.y + dy
-                if 0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT:
-                    manhattan = abs(dx) + abs(dy)
-                    if manhattan == 0 or manhattan > self.sight_distance:
-                        continue
-                    effective = self.get_effective_sight((nx, ny), layers)
-                    if effective > 35:
-                        if layers["safety"][nx][ny] == 1:
-                            safety_targets.append((nx, ny))
-                        if layers["hazards"][nx][ny] > 0:
-                            hazard_visible = True
+        seen = self.seen_cells(layers)
+        safety_targets = [tuple(cell) for cell in seen[layers["safety"][seen[:, 0], seen[:, 1]] == 1].tolist()]
+        hazard_visible = bool((layers["hazards"][seen[:, 0], seen[:, 1]] > 0).any())
         if safety_targets:
             target = min(safety_targets, key=lambda t: abs(t[0]-self.x)+abs(t[1]-self.y))
             self.move(target, layers)
@@ -256,6 +271,15 @@ class Agent:
                 self.x, self.y = new_pos
                 self.apply_hazard_damage(layers)
 
+    def seen_cells(self, layers):
+        """
+        Cells of the sight diamond (Manhattan 1..sight_distance) seen with more than 35%
+        effective sight, in x-major order.
+        """
+        cells, effective = self.visible_cells(layers)
+        manhattan = np.abs(cells - (self.x, self.y)).sum(axis=1)
+        return cells[(manhattan > 0) & (manhattan <= self.sight_distance) & (effective > 35)]
+
     def apply_hazard_damage(self, layers):
         if self.remaining_life <= 0:
             return
@@ -274,43 +298,44 @@ class Agent:
     def report_local_info(self, true_map):
         """
         Rescuer reporting function: scans cells within self.sight_distance and reports
-        information (timestamp, items, confidence score) with a smaller range.
+        them as a SensorReport (full confidence up to 3 cells away, then 5% less per cell).
         """
-        info = {}
-        current_time = time.time()
-        for i in range(max(0, self.x - self.sight_distance), min(GRID_WIDTH, self.x + self.sight_distance + 1)):
-            for j in range(max(0, self.y - self.sight_distance), min(GRID_HEIGHT, self.y + self.sight_distance + 1)):
-                distance = abs(i - self.x) + abs(j - self.y)
-                if distance <= 3:
-                    base = 100
-                else:
-                    base = 100 - 5 * (distance - 3)
-                obstruction = true_map["sight"][i][j] / 100.0
-                confidence = max(0, base * (1 - obstruction))
-                info[(i, j)] = {
-                    "timestamp": current_time,
-                    "items": {
-                        "hazard": true_map["hazards"][i][j],
-                        "obstacle": true_map["obstacles"][i][j],
-                        "safety": true_map["safety"][i][j]
-                    },
-                    "confidence": confidence
-                }
-        return info
+        return SensorReport.capture(true_map, self.x, self.y, self.sight_distance, full_range=3)
+
+def _population_field(name, cast):
+    # Attribute of a Victim view that reads and writes its slot in the population arrays.
+    return property(lambda self: cast(getattr(self.population, name)[self.index]),
+                    lambda self, value: getattr(self.population, name).__setitem__(self.index, value))
 
 class Victim:
-    def __init__(self, x, y, sight_distance=3, remaining_life=100):
-        self.x = x
-        self.y = y
-        self.rescued = False
-        self.being_guided = False  # Lock flag when being guided.
-        self.sight_distance = sight_distance
-        self.remaining_life = remaining_life
-        self.base_sight = {1: 100, 2: 70, 3: 40}
-        self.rescued_by = None
+    """
+    A single victim: a thin view of one slot of a VictimPopulation, so agent guidance
+    code can keep reading and setting victim.x, victim.rescued, ... A Victim created on
+    its own gets a population of one.
+    """
+    x = _population_field("x", int)
+    y = _population_field("y", int)
+    remaining_life = _population_field("life", int)
+    rescued = _population_field("rescued", bool)
+    being_guided = _population_field("being_guided", bool)  # Lock flag when being guided.
+    rescued_by = _population_field("rescued_by", lambda value: value)
+
+    def __init__(self, x, y, sight_distance=3, remaining_life=100, population=None, index=0):
+        if population is None:
+            population = VictimPopulation([(x, y)], sight_distance, remaining_life)
+        self.population = population
+        self.index = index
+
+    @property
+    def sight_distance(self):
+        return self.population.sight_distance
+
+    @property
+    def base_sight(self):
+        return self.population.base_sight
 
     def render(self, screen):
-        pygame.draw.circle(
+        return pygame.draw.circle(
             screen,
             YELLOW,
             (self.x * CELL_SIZE + CELL_SIZE // 2, self.y * CELL_SIZE + CELL_SIZE // 2),
@@ -328,31 +353,37 @@ class Victim:
         for i in range(1, steps):
             inter_x = self.x + round(i * dx / steps)
             inter_y = self.y + round(i * dy / steps)
-            obs = layers["sight"][inter_x][inter_y]
+            obs = int(layers["sight"][inter_x][inter_y])
             if obs > max_obstruction:
                 max_obstruction = obs
         effective = max(0, base - max_obstruction)
         return effective
 
+    def visible_cells(self, layers, radius=None):
+        """
+        get_effective_sight for every map cell within radius (Chebyshev, default
+        sight_distance) in one pass. Returns (cells, effective) arrays.
+        """
+        radius = self.sight_distance if radius is None else radius
+        cells, steps, obstruction = sight_window(layers["sight"], (self.x, self.y), radius)
+        base = base_by_steps(self.base_sight, self.sight_distance, radius)[steps]
+        return cells, np.maximum(0, base - obstruction)
+
+    def seen_cells(self, layers):
+        """
+        Cells of the sight diamond (Manhattan 1..sight_distance) seen with more than 35%
+        effective sight, in x-major order.
+        """
+        cells, effective = self.visible_cells(layers)
+        manhattan = np.abs(cells - (self.x, self.y)).sum(axis=1)
+        return cells[(manhattan > 0) & (manhattan <= self.sight_distance) & (effective > 35)]
+
     def self_rescue(self, layers):
         if self.remaining_life <= 0 or self.rescued or self.being_guided:
             return
-        safety_targets = []
-        hazard_positions = []
-        for dx in range(-self.sight_distance, self.sight_distance + 1):
-            for dy in range(-self.sight_distance, self.sight_distance + 1):
-                nx = self.x + dx
-                ny = self.y + dy
-                if 0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT:
-                    manhattan = abs(dx) + abs(dy)
-                    if manhattan == 0 or manhattan > self.sight_distance:
-                        continue
-                    effective = self.get_effective_sight((nx, ny), layers)
-                    if effective > 35:
-                        if layers["safety"][nx][ny] == 1:
-                            safety_targets.append((nx, ny))
-                        if layers["hazards"][nx][ny] > 0:
-                            hazard_positions.append((nx, ny))
+        seen = self.seen_cells(layers)
+        safety_targets = [tuple(cell) for cell in seen[layers["safety"][seen[:, 0], seen[:, 1]] == 1].tolist()]
+        hazard_positions = [tuple(cell) for cell in seen[layers["hazards"][seen[:, 0], seen[:, 1]] > 0].tolist()]
         if safety_targets:
             target = min(safety_targets, key=lambda t: abs(t[0]-self.x)+abs(t[1]-self.y))
             new_pos = move_towards(self.x, self.y, target[0], target[1], 1)
@@ -387,3 +418,146 @@ class Victim:
             self.remaining_life -= 100
         if self.remaining_life < 0:
             self.remaining_life = 0
+
+# Life lost by a victim per step on a hazard of each level, as in Victim.apply_hazard_damage.
+VICTIM_HAZARD_DAMAGE = np.array([0, 10, 20, 100])
+NEIGHBOUR_STEPS = np.array([(-1, 0), (1, 0), (0, -1), (0, 1)])
+
+class VictimPopulation:
+    """
+    Struct-of-arrays store of victims: positions, life, rescued and being-guided flags
+    live in NumPy arrays, and step() runs the whole victim phase of a round for every
+    victim at once. Iterating or indexing yields Victim views of the slots.
+    """
+    def __init__(self, positions, sight_distance=3, remaining_life=100, rng=None):
+        positions = np.array(positions, dtype=np.int64).reshape(-1, 2)
+        count = len(positions)
+        self.x = positions[:, 0].copy()
+        self.y = positions[:, 1].copy()
+        self.life = np.full(count, remaining_life, dtype=np.int64)
+        self.rescued = np.zeros(count, dtype=bool)
+        self.being_guided = np.zeros(count, dtype=bool)
+        self.rescued_by = np.full(count, None, dtype=object)
+        self.sight_distance = sight_distance
+        self.base_sight = {1: 100, 2: 70, 3: 40}
+        self.rng = rng  # seeded from `random` on first use, so seeded runs stay reproducible
+        self._views = None
+
+    def __len__(self):
+        return len(self.x)
+
+    def _get_views(self):
+        if self._views is None:
+            self._views = [Victim(0, 0, population=self, index=i) for i in range(len(self))]
+        return self._views
+
+    def __iter__(self):
+        return iter(self._get_views())
+
+    def __getitem__(self, index):
+        return self._get_views()[index]
+
+    def _apply_hazard_damage(self, layers, members):
+        members = members[self.life[members] > 0]
+        damage = VICTIM_HAZARD_DAMAGE[layers["hazards"][self.x[members], self.y[members]]]
+        self.life[members] = np.maximum(self.life[members] - damage, 0)
+
+    def _sense(self, layers, members):
+        """
+        The sight diamond of each member as (cells, seen): cells is (M, D, 2) in the
+        x-major order self_rescue scans, seen marks cells with more than 35% effective sight.
+        """
+        offsets, steps, ray, on_ray = ray_table(self.sight_distance)
+        manhattan = np.abs(offsets).sum(axis=1)
+        diamond = (manhattan > 0) & (manhattan <= self.sight_distance)
+        offsets, steps, ray, on_ray = offsets[diamond], steps[diamond], ray[diamond], on_ray[diamond]
+        origin = np.stack((self.x[members], self.y[members]), axis=1)
+        cells = origin[:, None, :] + offsets[None, :, :]
+        shape = np.array(layers["sight"].shape)
+        inside = ((cells >= 0) & (cells < shape)).all(axis=2)
+        obstruction = np.zeros(inside.shape, dtype=np.int64)
+        if ray.shape[1]:
+            # Off-map targets read clipped cells; they are masked out by inside below.
+            crossed = np.clip(origin[:, None, None, :] + ray[None], 0, shape - 1)
+            values = layers["sight"][crossed[..., 0], crossed[..., 1]].astype(np.int64)
+            obstruction = np.where(on_ray[None], values, 0).max(axis=2)
+        base = base_by_steps(self.base_sight, self.sight_distance, self.sight_distance)[steps]
+        seen = inside & (np.maximum(0, base[None, :] - obstruction) > 35)
+        return np.clip(cells, 0, shape - 1), seen
+
+    def step(self, layers):
+        """
+        One round of the baseline victim phase for all victims: dead victims are retired,
+        the rest run self_rescue (head for visible safety, else away from visible hazards),
+        take a random free step if that did not move them, take hazard damage and are
+        rescued once they stand in a safety zone.
+        """
+        active = ~self.rescued
+        self.rescued[active & (self.life <= 0)] = True
+        members = np.flatnonzero(active & (self.life > 0))
+        if len(members) == 0:
+            return
+        start_x, start_y = self.x[members].copy(), self.y[members].copy()
+        obstacles, safety, hazards = layers["obstacles"], layers["safety"], layers["hazards"]
+
+        sensing = members[~self.being_guided[members]]
+        cells, seen = self._sense(layers, sensing)
+        is_safe = seen & (safety[cells[..., 0], cells[..., 1]] == 1)
+        is_hazard = seen & (hazards[cells[..., 0], cells[..., 1]] > 0)
+        to_safety = is_safe.any(axis=1)
+        from_hazard = ~to_safety & is_hazard.any(axis=1)
+
+        # Toward the nearest visible safety cell (first in scan order on ties), one step.
+        movers = sensing[to_safety]
+        if len(movers):
+            distance = np.abs(cells[to_safety] - np.stack((self.x[movers], self.y[movers]), axis=1)[:, None, :]).sum(axis=2)
+            target = cells[to_safety][np.arange(len(movers)), np.where(is_safe[to_safety], distance, np.iinfo(np.int64).max).argmin(axis=1)]
+            dx, dy = target[:, 0] - self.x[movers], target[:, 1] - self.y[movers]
+            along_x = np.abs(dx) >= np.abs(dy)
+            new_x = self.x[movers] + np.where(along_x, np.sign(dx), 0)
+            new_y = self.y[movers] + np.where(along_x, 0, np.sign(dy))
+            free = obstacles[new_x, new_y] != 1
+            self.x[movers[free]], self.y[movers[free]] = new_x[free], new_y[free]
+
+        # Away from the mean position of the visible hazards.
+        fleeing = sensing[from_hazard]
+        if len(fleeing):
+            weights = is_hazard[from_hazard]
+            count = weights.sum(axis=1)
+            mean_x = (cells[from_hazard][..., 0] * weights).sum(axis=1) / count
+            mean_y = (cells[from_hazard][..., 1] * weights).sum(axis=1) / count
+            new_x = self.x[fleeing] + np.sign(self.x[fleeing] - mean_x).astype(np.int64)
+            new_y = self.y[fleeing] + np.sign(self.y[fleeing] - mean_y).astype(np.int64)
+            free = (new_x >= 0) & (new_x < obstacles.shape[0]) & (new_y >= 0) & (new_y < obstacles.shape[1])
+            free[free] = obstacles[new_x[free], new_y[free]] != 1
+            self.x[fleeing[free]], self.y[fleeing[free]] = new_x[free], new_y[free]
+
+        self._apply_hazard_damage(layers, np.concatenate((movers, fleeing)))
+        reached = movers[safety[self.x[movers], self.y[movers]] == 1]
+        self.rescued[reached] = True
+        for i in reached.tolist():
+            print(f"Victim reached safety at ({self.x[i]},{self.y[i]})")
+
+        # Victims that did not move take a random step to a free neighbour.
+        stuck = members[(self.x[members] == start_x) & (self.y[members] == start_y)]
+        if len(stuck):
+            new = np.stack((self.x[stuck], self.y[stuck]), axis=1)[:, None, :] + NEIGHBOUR_STEPS[None]
+            valid = (new[..., 0] >= 0) & (new[..., 0] < obstacles.shape[0]) & (new[..., 1] >= 0) & (new[..., 1] < obstacles.shape[1])
+            clipped = np.clip(new, 0, np.array(obstacles.shape) - 1)
+            valid &= obstacles[clipped[..., 0], clipped[..., 1]] != 1
+            choices = valid.sum(axis=1)
+            can_move = choices > 0
+            if self.rng is None:
+                self.rng = np.random.default_rng(random.getrandbits(64))
+            pick = (self.rng.random(len(stuck)) * choices).astype(np.int64)
+            # Index of the pick-th valid neighbour of each victim.
+            slot = (np.cumsum(valid, axis=1) > pick[:, None]).argmax(axis=1)
+            moved = stuck[can_move]
+            chosen = new[np.arange(len(stuck)), slot][can_move]
+            self.x[moved], self.y[moved] = chosen[:, 0], chosen[:, 1]
+            self._apply_hazard_damage(layers, moved)
+
+        on_safety = members[safety[self.x[members], self.y[members]] == 1]
+        self.rescued[on_safety] = True
+        unclaimed = on_safety[np.equal(self.rescued_by[on_safety], None)]
+        self.rescued_by[unclaimed] = "self"
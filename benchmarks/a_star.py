@@ -0,0 +1,105 @@
+"""
+Microbenchmark for pathfinding.a_star and PATH_CACHE: the original queue.PriorityQueue
+A* against the heapq core on flat cell indices, on the same random queries (results
+are checked to be identical), and find_path walkers with and without the path cache.
+
+    python benchmarks/a_star.py [--maps 6] [--queries 150]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from queue import PriorityQueue
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pathfinding
+from map import create_map
+
+def reference_a_star(grid, start, goal, agent_mode=False):
+    """The original a_star (bounds taken from the grid instead of GRID_WIDTH/HEIGHT)."""
+    width, height = len(grid), len(grid[0])
+    open_set = PriorityQueue()
+    open_set.put((0, start))
+    came_from = {}
+    cost_so_far = {start: 0}
+    while not open_set.empty():
+        current = open_set.get()[1]
+        if current == goal:
+            path = []
+            while current in came_from:
+                path.append(current)
+                current = came_from[current]
+            path.reverse()
+            return path
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            neighbor = (current[0] + dx, current[1] + dy)
+            if 0 <= neighbor[0] < width and 0 <= neighbor[1] < height:
+                if grid[neighbor[0]][neighbor[1]] == 1 and not agent_mode:
+                    continue
+                new_cost = cost_so_far[current] + 1
+                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                    cost_so_far[neighbor] = new_cost
+                    priority = new_cost + abs(goal[0] - neighbor[0]) + abs(goal[1] - neighbor[1])
+                    open_set.put((priority, neighbor))
+                    came_from[neighbor] = current
+    return []
+
+def timed(queries, search):
+    start = time.perf_counter()
+    routes = [search(*query) for query in queries]
+    return (time.perf_counter() - start) / len(queries), routes
+
+def walk(layers, queries, cached):
+    """Walkers that re-plan every step to their goal, as agents and drones do."""
+    steps = 0
+    for _, start, goal, agent_mode in queries:
+        position = start
+        while position != goal:
+            if not cached:
+                pathfinding.PATH_CACHE.invalidate()
+            route = pathfinding.find_path(layers, position, goal, agent_mode)
+            if not route:
+                break
+            position = route[0]
+            steps += 1
+    return steps
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--maps", type=int, default=6)
+    parser.add_argument("--queries", type=int, default=150)
+    args = parser.parse_args()
+
+    queries, maps = [], []
+    for seed in range(args.maps):
+        random.seed(seed)
+        layers = create_map()
+        maps.append(layers)
+        width, height = layers["obstacles"].shape
+        for _ in range(args.queries):
+            start = (random.randrange(width), random.randrange(height))
+            goal = (random.randrange(width), random.randrange(height))
+            queries.append((layers["obstacles"], start, goal, random.random() < 0.5))
+    print(f"{len(queries)} queries on {args.maps} maps, half in agent_mode")
+
+    list_queries = [(grid.tolist(), start, goal, mode) for grid, start, goal, mode in queries]
+    old, old_routes = timed(list_queries, reference_a_star)
+    # A unit cost layer keeps a_star on its heapq core instead of jump point search.
+    unit = [1] * queries[0][0].size
+    core, core_routes = timed(queries, lambda grid, start, goal, mode: pathfinding.a_star(grid, start, goal, mode, unit))
+    assert core_routes == old_routes, "heapq core routes differ from the original a_star"
+    print(f"PriorityQueue a_star: {old * 1000:7.2f} ms/query")
+    print(f"heapq core:           {core * 1000:7.2f} ms/query  ({old / core:.1f}x, identical routes)")
+
+    walkers = [query for query in queries if query[0] is maps[0]["obstacles"]][:40]
+    for cached in (False, True):
+        hits = pathfinding.PATH_CACHE.hits
+        start = time.perf_counter()
+        steps = walk(maps[0], walkers, cached)
+        elapsed = time.perf_counter() - start
+        print(f"find_path walkers, cache {'on ' if cached else 'off'}: {elapsed * 1000 / steps:6.3f} ms/step "
+              f"({steps} steps, {pathfinding.PATH_CACHE.hits - hits} hits)")
+
+if __name__ == "__main__":
+    main()
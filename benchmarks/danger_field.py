@@ -0,0 +1,71 @@
+"""
+Radius-scaling benchmark for commander.danger_field: the per-victim loop it replaced
+against the field built with shifted sums and with an FFT, per danger radius. The
+crossover between the last two is where DANGER_FFT_MIN_RADIUS belongs.
+
+    python benchmarks/danger_field.py [--width 75] [--height 50] [--victims 100]
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import commander
+from map import new_version
+
+def reference_danger_level(hazards, x, y, radius):
+    width, height = hazards.shape
+    total = 0
+    for i in range(max(0, x - radius), min(width, x + radius + 1)):
+        for j in range(max(0, y - radius), min(height, y + radius + 1)):
+            if hazards[i][j] > 0:
+                d = abs(x - i) + abs(y - j)
+                if d == 0:
+                    d = 1
+                total += hazards[i][j] / d
+    return total
+
+def build_time(layers, radius, fft_min_radius, repeats=5):
+    """Best-of-repeats build time of danger_field with the given method threshold."""
+    saved = commander.DANGER_FFT_MIN_RADIUS
+    commander.DANGER_FFT_MIN_RADIUS = fft_min_radius
+    try:
+        best = float("inf")
+        for _ in range(repeats):
+            layers["versions"]["hazards"] = new_version()  # defeat the cache
+            start = time.perf_counter()
+            commander.danger_field(layers, radius)
+            best = min(best, time.perf_counter() - start)
+        return best
+    finally:
+        commander.DANGER_FFT_MIN_RADIUS = saved
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=75)
+    parser.add_argument("--height", type=int, default=50)
+    parser.add_argument("--victims", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    hazards = rng.choice(4, size=(args.width, args.height), p=[0.85, 0.05, 0.05, 0.05]).astype(np.uint8)
+    layers = {"hazards": hazards, "versions": {"hazards": new_version()}}
+    victims = list(zip(rng.integers(0, args.width, args.victims).tolist(),
+                       rng.integers(0, args.height, args.victims).tolist()))
+    print(f"{args.width}x{args.height} map, {args.victims} victims, "
+          f"DANGER_FFT_MIN_RADIUS = {commander.DANGER_FFT_MIN_RADIUS}")
+    print(f"{'radius':>6} {'loop (ms)':>10} {'shifted (ms)':>13} {'fft (ms)':>9}  faster build")
+    for radius in (1, 2, 3, 4, 5, 10, 20, 40):
+        start = time.perf_counter()
+        for x, y in victims:
+            reference_danger_level(hazards, x, y, radius)
+        loop = time.perf_counter() - start
+        shifted = build_time(layers, radius, fft_min_radius=radius + 1)
+        fft = build_time(layers, radius, fft_min_radius=0)
+        print(f"{radius:>6} {loop * 1000:>10.2f} {shifted * 1000:>13.3f} {fft * 1000:>9.3f}  "
+              f"{'fft' if fft < shifted else 'shifted'}")
+
+if __name__ == "__main__":
+    main()
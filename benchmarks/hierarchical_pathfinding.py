@@ -0,0 +1,66 @@
+"""
+Benchmark of the hierarchical (HPA*) planner against a_star on unweighted, obstacle-aware
+queries over a large random obstacle map: time per query, route length relative to a_star,
+and the cost of building the planner and of updating it after a few obstacle changes.
+
+    python benchmarks/hierarchical_pathfinding.py [--width 600] [--height 500] [--queries 60]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pathfinding
+from hierarchical_pathfinding import HierarchicalPlanner
+
+def timed(call):
+    start = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=600)
+    parser.add_argument("--height", type=int, default=500)
+    parser.add_argument("--density", type=float, default=0.25)
+    parser.add_argument("--queries", type=int, default=60)
+    parser.add_argument("--flips", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(12)
+    rand = random.Random(12)
+    grid = (rng.random((args.width, args.height)) < args.density).astype(np.uint8)
+    unit = [1] * grid.size  # keeps a_star on its heapq core
+    planner, build_time = timed(lambda: HierarchicalPlanner(grid))
+    pathfinding.a_star(grid, (0, 0), (0, 0))  # builds the jump tables outside the timings
+
+    times = np.zeros(3)
+    ratios = []
+    for _ in range(args.queries):
+        start = (rand.randrange(args.width), rand.randrange(args.height))
+        goal = (rand.randrange(args.width), rand.randrange(args.height))
+        h_route, h_time = timed(lambda: planner.find_path(start, goal))
+        a_route, a_time = timed(lambda: pathfinding.a_star(grid, start, goal, False, unit))
+        _, j_time = timed(lambda: pathfinding.a_star(grid, start, goal))
+        assert bool(h_route) == bool(a_route), (start, goal)
+        if a_route:
+            ratios.append(len(h_route) / len(a_route))
+        times += (h_time, a_time, j_time)
+
+    flipped = grid.copy()
+    for _ in range(args.flips):
+        cell = (rand.randrange(args.width), rand.randrange(args.height))
+        flipped[cell] ^= 1
+    _, update_time = timed(lambda: planner.update(flipped))
+
+    times *= 1000 / args.queries
+    print(f"{args.width}x{args.height}, {args.density:.0%} obstacles, {args.queries} queries")
+    print(f"  per query: HPA {times[0]:.2f} ms, A* {times[1]:.2f} ms, JPS {times[2]:.2f} ms")
+    print(f"  HPA / A* route length: mean {np.mean(ratios):.3f}, max {np.max(ratios):.3f}")
+    print(f"  build {build_time * 1000:.0f} ms, update after {args.flips} flips {update_time * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
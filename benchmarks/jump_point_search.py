@@ -0,0 +1,58 @@
+"""
+Benchmark of jump point search against the heapq A* core on unit-cost queries: node
+expansions and time per query on sparse and dense random obstacle maps. Route lengths
+are checked to be equal. JPS time is given for a fresh map (including the build of its
+vertical jump tables) and for a map already searched, as in the simulation.
+
+    python benchmarks/jump_point_search.py [--queries 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pathfinding
+
+CASES = [
+    ("75x50 sparse 5%", 75, 50, 0.05, False),
+    ("75x50 dense 30%", 75, 50, 0.30, False),
+    ("200x200 sparse 5%", 200, 200, 0.05, False),
+    ("200x200 dense 30%", 200, 200, 0.30, False),
+    ("75x50 agent_mode", 75, 50, 0.20, True),
+]
+
+def run(search):
+    """Runs search and returns (route, seconds, nodes expanded)."""
+    start = time.perf_counter()
+    route = search()
+    return route, time.perf_counter() - start, pathfinding._search_state.expanded
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'map':<20} {'A* expanded':>12} {'JPS expanded':>13} {'A* ms':>7} {'JPS ms':>7} {'JPS warm ms':>12}")
+    for name, width, height, density, agent_mode in CASES:
+        rng = np.random.default_rng(3)
+        rand = random.Random(3)
+        unit = [1] * (width * height)  # keeps a_star on its heapq core
+        totals = np.zeros(5)
+        for _ in range(args.queries):
+            grid = (rng.random((width, height)) < density).astype(np.uint8)
+            start = (rand.randrange(width), rand.randrange(height))
+            goal = (rand.randrange(width), rand.randrange(height))
+            a_route, a_time, a_expanded = run(lambda: pathfinding.a_star(grid, start, goal, agent_mode, unit))
+            j_route, j_time, j_expanded = run(lambda: pathfinding.jump_point_search(grid, start, goal, agent_mode))
+            _, warm_time, _ = run(lambda: pathfinding.jump_point_search(grid, start, goal, agent_mode))
+            assert len(a_route) == len(j_route), (name, start, goal)
+            totals += (a_expanded, j_expanded, a_time, j_time, warm_time)
+        a_expanded, j_expanded, a_time, j_time, warm_time = totals / args.queries
+        print(f"{name:<20} {a_expanded:>12.0f} {j_expanded:>13.0f} {a_time * 1000:>7.2f} {j_time * 1000:>7.2f} "
+              f"{warm_time * 1000:>12.2f}")
+
+if __name__ == "__main__":
+    main()
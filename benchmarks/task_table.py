@@ -0,0 +1,108 @@
+"""
+Benchmark of the Commander's task table: select_task time per round when scored pairs
+are kept between rounds (fed the round's map changes) against a Commander planning every
+pair from scratch, on the same evolving map. The hazards evolve every round and the
+chosen agent walks one step along its task. Two cases: the perceived map follows every
+hazard change (the worst case for the table), or, as with the Communicator, only the
+cells within sight of one agent per round. Reports evaluations, reuse and whether the
+two picked the same task.
+
+    python benchmarks/task_table.py [--rounds 60] [--agents 4] [--victims 60] [--sight 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pathfinding
+from commander import Commander
+from map import create_map, evolve_situation, patch_sight_layer, touch_layers
+
+def timed(cache, call):
+    """Runs call with cache as the path cache; returns (result, seconds)."""
+    saved, pathfinding.PATH_CACHE = pathfinding.PATH_CACHE, cache
+    start = time.perf_counter()
+    try:
+        return call(), time.perf_counter() - start
+    finally:
+        pathfinding.PATH_CACHE = saved
+
+def report_window(layers, true_map, agent, sight):
+    """
+    Copies the true hazards around agent into layers like a Communicator report and
+    returns the take_changes record.
+    """
+    width, height = layers["hazards"].shape
+    x0, y0 = max(agent.x - sight, 0), max(agent.y - sight, 0)
+    window = (slice(x0, min(agent.x + sight + 1, width)), slice(y0, min(agent.y + sight + 1, height)))
+    cells = np.argwhere(layers["hazards"][window] != true_map["hazards"][window]) + (x0, y0)
+    if not len(cells):
+        return {}
+    layers["hazards"][cells[:, 0], cells[:, 1]] = true_map["hazards"][cells[:, 0], cells[:, 1]]
+    sight_cells = patch_sight_layer(layers["sight"], layers["hazards"], cells)
+    touch_layers(layers, "hazards", "sight")
+    return {"hazards": cells, "sight": sight_cells}
+
+def run(args, local):
+    random.seed(24)
+    rng = np.random.default_rng(24)
+    true_map = create_map()
+    layers = {name: true_map[name].copy() for name in ("obstacles", "safety", "hazards", "sight")}
+    layers["versions"] = dict(true_map["versions"])
+    width, height = layers["obstacles"].shape
+
+    def entity():
+        return SimpleNamespace(x=int(rng.integers(1, width - 1)), y=int(rng.integers(1, height - 1)),
+                               remaining_life=100, rescued=False)
+
+    agents = [entity() for _ in range(args.agents)]
+    victims = [entity() for _ in range(args.victims)]
+    table = Commander()
+    table_cache, scratch_cache = pathfinding.PathCache(), pathfinding.PathCache()
+    table_time = scratch_time = 0.0
+    scratch_evaluations = same = 0
+    changes = None
+    for _ in range(args.rounds):
+        task, seconds = timed(table_cache, lambda: table.select_task(agents, victims, [], layers, changes=changes))
+        table_time += seconds
+        scratch = Commander()
+        expected, seconds = timed(scratch_cache, lambda: scratch.select_task(agents, victims, [], layers))
+        scratch_time += seconds
+        scratch_evaluations += scratch.evaluations
+        same += (task is None and expected is None) or (
+            task is not None and expected is not None and task["agent"] is expected["agent"]
+            and task["victim"] is expected["victim"] and task["score"] == expected["score"])
+        if task is not None:
+            task["agent"].x, task["agent"].y = task["path"][0]
+        if local:
+            evolve_situation(true_map, rng)
+            changes = report_window(layers, true_map, agents[int(rng.integers(len(agents)))], args.sight)
+        else:
+            sight = layers["sight"].copy()
+            hazards = evolve_situation(layers, rng)
+            changes = {"hazards": hazards, "sight": np.argwhere(layers["sight"] != sight)}
+
+    print(f"{'one report per round' if local else 'every hazard change'}:")
+    print(f"  task table:   {table_time / args.rounds * 1000:7.2f} ms/round, "
+          f"{table.evaluations} evaluations, {table.reused} reused")
+    print(f"  from scratch: {scratch_time / args.rounds * 1000:7.2f} ms/round, {scratch_evaluations} evaluations")
+    print(f"  speedup {scratch_time / table_time:.1f}x, same task in {same}/{args.rounds} rounds")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=60)
+    parser.add_argument("--agents", type=int, default=4)
+    parser.add_argument("--victims", type=int, default=60)
+    parser.add_argument("--sight", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.rounds} rounds, {args.agents} agents, {args.victims} victims")
+    for local in (False, True):
+        run(args, local)
+
+if __name__ == "__main__":
+    main()
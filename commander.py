@@ -1,7 +1,11 @@
 import math
-from config import GRID_WIDTH, GRID_HEIGHT
-from pathfinding import a_star
-from map import find_nearest_safe_zone
+import time
+import numpy as np
+from config import GRID_WIDTH, GRID_HEIGHT, COMMANDER_CANDIDATES, COMMANDER_ASSIGNMENT, COMMANDER_PLAN_BUDGET
+from pathfinding import find_path, exit_field, multi_goal_search, cached_by_version, DistanceField, DERIVED_CACHE_SIZE
+from map import shifted_slices
+from spatial_index import SpatialIndex
+from summed_area import region_counts, SummedAreaTable
 
 def compute_route_cost(route, layers):
     """
@@ -30,74 +34,213 @@ def compute_route_cost(route, layers):
     cost = length + hazard_cost - connectivity
     return cost
 
+# Hazard penalty per level, as in compute_route_cost.
+ROUTE_HAZARD_COST = np.array([0, 10, 20, 100])
+
+def route_cell_costs(layers):
+    """
+    Cost of entering each cell under compute_route_cost, flattened for the planner:
+    one step, the hazard penalty, and (4 - free neighbours) in place of the connectivity
+    bonus. The bonus is shifted by 4 per step so every cost stays non-negative, i.e. the
+    planner minimises compute_route_cost(route) + 4 * len(route).
+    Computed once per obstacle/hazard layer version.
+    """
+    def build():
+        obstacles = layers["obstacles"]
+        free = np.zeros(obstacles.shape, dtype=np.int32)
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            target, source = shifted_slices(dx, dy, obstacles.shape)
+            free[target] += obstacles[source] != 1
+        return (1 + ROUTE_HAZARD_COST[layers["hazards"]] + 4 - free).ravel().tolist()
+    key = (layers["versions"]["obstacles"], layers["versions"]["hazards"])
+    return cached_by_version("route_cell_costs", key, build)
+
+# Radii from which danger_field convolves by FFT; below it shifted sums are faster.
+DANGER_FFT_MIN_RADIUS = 3
+
+def danger_kernel(radius):
+    """
+    Weight 1 / d of a hazard at Manhattan distance d (its own cell counts as d = 1) over
+    the (2 * radius + 1)^2 window compute_danger_level sums.
+    """
+    span = np.abs(np.arange(-radius, radius + 1))
+    return 1.0 / np.maximum(1, span[:, None] + span[None, :])
+
+def danger_field(layers, radius):
+    """
+    compute_danger_level for every cell at once: the hazard layer convolved with
+    danger_kernel (the kernel is symmetric, and cells past the map edge count as 0).
+    Small radii use shifted sums, larger ones an FFT. Cached per hazard version and radius.
+    """
+    def build():
+        hazards = layers["hazards"].astype(np.float64)
+        kernel = danger_kernel(radius)
+        if radius < DANGER_FFT_MIN_RADIUS:
+            field = np.zeros(hazards.shape)
+            for dx in range(-radius, radius + 1):
+                for dy in range(-radius, radius + 1):
+                    target, source = shifted_slices(dx, dy, hazards.shape)
+                    field[target] += kernel[dx + radius, dy + radius] * hazards[source]
+            return field
+        width, height = hazards.shape
+        shape = (width + 2 * radius, height + 2 * radius)
+        full = np.fft.irfft2(np.fft.rfft2(hazards, shape) * np.fft.rfft2(kernel, shape), shape)
+        field = full[radius:radius + width, radius:radius + height]
+        field[field < 1e-9] = 0  # round-off where no hazard is in reach
+        return field
+    return cached_by_version("danger_field", (layers["versions"]["hazards"], radius), build)
+
 def compute_optimal_route(start, layers):
     """
-    Evaluate candidate routes from start to safety zones.
-    Returns the route with the lowest computed cost.
-    """
-    candidate_exits = []
-    for x in range(GRID_WIDTH):
-        for y in range(GRID_HEIGHT):
-            if layers["safety"][x][y] == 1:
-                candidate_exits.append((x, y))
-    best_route = None
-    best_cost = float('inf')
-    for exit_pos in candidate_exits:
-        route = a_star(layers["obstacles"], start, exit_pos, agent_mode=True)
-        if route:
-            cost = compute_route_cost(route, layers)
-            if cost < best_cost:
-                best_cost = cost
-                best_route = route
-    return best_route
+    Finds the cheapest route from start to any safety zone in a single multi-goal search.
+    Returns None if no safety zone is reachable.
+    """
+    route = multi_goal_search(layers["obstacles"], start, layers["safety"], route_cell_costs(layers),
+                              agent_mode=True)
+    return route or None
+
+def min_cost_assignment(cost):
+    """
+    Hungarian algorithm (shortest augmenting paths with potentials) for a rows x columns
+    cost matrix. Matches min(rows, columns) pairs at minimum total cost and returns them
+    as a list of (row, column) tuples sorted by row.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    rows, columns = cost.shape
+    if rows > columns:
+        return sorted((row, column) for column, row in min_cost_assignment(cost.T))
+    # 1-based as in the textbook formulation; column 0 is the root of each search.
+    u = np.zeros(rows + 1)
+    v = np.zeros(columns + 1)
+    owner = np.zeros(columns + 1, dtype=np.int64)  # row matched to each column, 0 = none
+    way = np.zeros(columns + 1, dtype=np.int64)
+    for row in range(1, rows + 1):
+        owner[0] = row
+        column = 0
+        min_slack = np.full(columns + 1, np.inf)
+        used = np.zeros(columns + 1, dtype=bool)
+        while True:
+            used[column] = True
+            current = owner[column]
+            slack = cost[current - 1] - u[current] - v[1:]
+            better = ~used[1:] & (slack < min_slack[1:])
+            min_slack[1:][better] = slack[better]
+            way[1:][better] = column
+            candidates = np.where(used[1:], np.inf, min_slack[1:])
+            next_column = int(candidates.argmin()) + 1
+            delta = candidates[next_column - 1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            min_slack[~used] -= delta
+            column = next_column
+            if owner[column] == 0:
+                break
+        while column:
+            previous = way[column]
+            owner[column] = owner[previous]
+            column = previous
+    return sorted((int(owner[column]) - 1, column - 1) for column in range(1, columns + 1) if owner[column])
+
+# Map changes within this many cells of a scored task's paths make it stale.
+TASK_REGION_MARGIN = 2
+
+# Layers a task's paths and score are computed from.
+TASK_LAYERS = ("obstacles", "hazards", "sight", "safety")
+
+def near_changes(cells, changed):
+    """
+    Whether a SummedAreaTable of changed cells has any within TASK_REGION_MARGIN
+    (Chebyshev) of an (N, 2) array of cells.
+    """
+    xs, ys = cells[:, 0], cells[:, 1]
+    return bool(changed.counts(xs - TASK_REGION_MARGIN, ys - TASK_REGION_MARGIN,
+                               xs + TASK_REGION_MARGIN, ys + TASK_REGION_MARGIN).any())
+
+# Stands in for a route to safety that was not planned (see Commander._safety_route).
+_UNPLANNED = object()
+
+class _ScoredTask:
+    """
+    One (agent, victim) pair in the Commander's task table: the positions and paths it
+    was scored with, its score, and the map epoch it was last checked against (see
+    Commander._changed_region). path_to_safety is the victim's shared route (see
+    Commander._safety_route); path_to_victim is None for pairs without a candidate.
+    """
+    def __init__(self, agent, victim, path_to_victim, path_to_safety, score, epoch):
+        self.agent = agent
+        self.victim = victim
+        self.agent_position = (agent.x, agent.y)
+        self.victim_position = (victim.x, victim.y)
+        self.path_to_victim = path_to_victim
+        self.path_to_safety = path_to_safety
+        self.score = score
+        self.epoch = epoch
+        self.cells = np.array([self.agent_position] + (path_to_victim or []))
+
+    @property
+    def path(self):
+        return self.path_to_victim + self.path_to_safety
+
+def agent_field(layers, agent, cache_size=DERIVED_CACHE_SIZE):
+    """
+    DistanceField from an agent's cell, cached by obstacle version and position. The
+    fields have a cache of their own; pass a cache_size of at least the number of agents
+    so that agents that stay put keep theirs from round to round.
+    """
+    key = (layers["versions"]["obstacles"], agent.x, agent.y)
+    return cached_by_version("agent_field", key, lambda: DistanceField(layers["obstacles"], [(agent.x, agent.y)]),
+                             cache_size)
 
 class Commander:
-    def __init__(self, danger_radius=10, rescue_area=3, use_rl_selection=False):
+    def __init__(self, danger_radius=10, rescue_area=3, use_rl_selection=False, assignment_mode=COMMANDER_ASSIGNMENT,
+                 plan_budget=COMMANDER_PLAN_BUDGET):
         self.danger_radius = danger_radius
         self.rescue_area = rescue_area
         self.use_rl_selection = use_rl_selection
+        self.assignment_mode = assignment_mode  # match all idle agents at once (assign_tasks)
         self.rl_model = None  # Placeholder for an RL model if available
+        self.task_table = {}  # (id(agent), id(victim)) -> _ScoredTask, kept between rounds
+        self.safety_routes = {}  # id(victim) -> [position, route to safety, its cells, epoch]
+        self.map_epoch = 0  # number of map diffs the task table has seen
+        self.table_versions = {}  # perceived-map layer versions the task table is up to date with
+        self.evaluations = 0  # pairs scored from scratch by select_task
+        self.reused = 0  # pairs served from the task table
+        self.plan_budget = plan_budget  # seconds select_task may plan per round, None = no limit
+        self.deferred = set()  # pairs left unplanned when the budget ran out, first in line next round
+        self.planning_rounds = 0
+        self.budget_hits = 0  # rounds in which select_task ran out of budget
 
     def compute_danger_level(self, victim, layers):
         """
-        Compute the danger level for a victim as the sum over nearby hazard influence.
+        Compute the danger level for a victim as the sum over nearby hazard influence
+        (hazard level / Manhattan distance within danger_radius), read from danger_field.
         """
-        total = 0
-        for i in range(max(0, victim.x - self.danger_radius), min(GRID_WIDTH, victim.x + self.danger_radius + 1)):
-            for j in range(max(0, victim.y - self.danger_radius), min(GRID_HEIGHT, victim.y + self.danger_radius + 1)):
-                if layers["hazards"][i][j] > 0:
-                    d = abs(victim.x - i) + abs(victim.y - j)
-                    if d == 0:
-                        d = 1
-                    total += layers["hazards"][i][j] / d
-        return total
+        return float(danger_field(layers, self.danger_radius)[victim.x, victim.y])
 
     def compute_self_rescue_score(self, victim, layers):
         """
         Estimate victim’s self-rescue ability based on distance to safety and local free space.
         """
-        exit_pos = find_nearest_safe_zone(layers["safety"], victim.x, victim.y)
-        if exit_pos is None:
+        distance = exit_field(layers).distance((victim.x, victim.y))
+        if distance is None:
             return 0
-        distance = abs(victim.x - exit_pos[0]) + abs(victim.y - exit_pos[1])
-        count_free = 0
-        total = 0
-        for i in range(max(0, victim.x - self.rescue_area), min(GRID_WIDTH, victim.x + self.rescue_area + 1)):
-            for j in range(max(0, victim.y - self.rescue_area), min(GRID_HEIGHT, victim.y + self.rescue_area + 1)):
-                total += 1
-                if layers["obstacles"][i][j] != 1:
-                    count_free += 1
+        x0, y0 = victim.x - self.rescue_area, victim.y - self.rescue_area
+        x1, y1 = victim.x + self.rescue_area, victim.y + self.rescue_area
+        count_free = region_counts(layers, "free").count(x0, y0, x1, y1)
+        width, height = layers["obstacles"].shape
+        total = max(0, min(x1, width - 1) - max(x0, 0) + 1) * max(0, min(y1, height - 1) - max(y0, 0) + 1)
         free_ratio = count_free / total if total > 0 else 0
         return free_ratio / (distance + 1)
 
     def generate_candidate_paths(self, victim, agent, drones, perceived_map):
         """
         Generate candidate paths:
-          - From agent to victim (using perceived map)
+          - From agent to victim (using perceived map, planned around hazards)
           - From victim to safety
           (Optionally, drone segments can be added for updated info.)
         """
-        path_to_victim = a_star(perceived_map["obstacles"], (agent.x, agent.y), (victim.x, victim.y), agent_mode=True)
+        path_to_victim = find_path(perceived_map, (agent.x, agent.y), (victim.x, victim.y), agent_mode=True,
+                                   weighted=True)
         path_to_safety = compute_optimal_route((victim.x, victim.y), perceived_map)
         candidate_paths = []
         if path_to_victim and path_to_safety:
@@ -114,38 +257,253 @@ class Commander:
         for pos in path:
             x, y = pos
             hazard = perceived_map["hazards"][x][y]
-            direct_cost += hazard * 5  # arbitrary weighting
+            direct_cost += int(hazard) * 5  # arbitrary weighting
         score = benefit - direct_cost
         return score
 
-    def select_task(self, agents, victims, drones, perceived_map):
+    def select_task(self, agents, victims, drones, perceived_map, index=None, changes=None):
         """
-        For each agent-victim pair, generate candidate paths and choose the task with the highest score.
+        For each agent and its COMMANDER_CANDIDATES nearest victims, generate candidate paths
+        and choose the task with the highest score. index is an up-to-date SpatialIndex of
+        victims; without one, a throwaway is built.
+        Scored pairs are kept in the task table between rounds. Given changes, the
+        Communicator's record of the cells changed since the last round (take_changes), a
+        pair is only scored again when its victim moved, the map changed near its paths, or
+        its agent left the planned path; an agent that walked along the path keeps the rest
+        of it. The highest score wins, ties going to the earlier agent and then the nearer
+        victim, as in a scan.
+        With a plan_budget, pairs are planned in priority order (those deferred last round,
+        then closest, then most endangered victim) until the budget is spent; the best task
+        found so far is returned and the rest is planned in the next rounds. At least one
+        pair is planned per round, so selection never stalls.
         If RL is enabled and a model is loaded, use it (stubbed here).
         """
-        best_task = None
-        best_score = -float('inf')
-        for agent in agents:
+        if index is None:
+            index = SpatialIndex(victims)
+        changed = self._changed_region(perceived_map, changes)
+        pairs = []
+        for agent_order, agent in enumerate(agents):
             if agent.remaining_life <= 0:
                 continue
-            for victim in victims:
-                if victim.rescued or victim.remaining_life <= 0:
-                    continue
-                candidate_paths = self.generate_candidate_paths(victim, agent, drones, perceived_map)
-                if not candidate_paths:
-                    continue
-                for path in candidate_paths:
-                    if self.use_rl_selection and self.rl_model is not None:
-                        predicted_score = self.rl_model.predict(path)  # Stub: replace with actual RL inference
-                    else:
-                        predicted_score = self.evaluate_path(path, victim, agent, perceived_map)
-                    if predicted_score > best_score:
-                        best_score = predicted_score
-                        best_task = {
-                            'agent': agent,
-                            'victim': victim,
-                            'path': path,
-                            'score': predicted_score,
-                            'target': (victim.x, victim.y)
-                        }
-        return best_task
+            nearest = index.nearest(agent.x, agent.y, k=COMMANDER_CANDIDATES,
+                                    where=lambda victim: not victim.rescued and victim.remaining_life > 0)
+            pairs.extend((agent_order, victim_order, agent, victim) for victim_order, victim in enumerate(nearest))
+        deadline = None
+        if self.plan_budget is not None:
+            deadline = time.perf_counter() + self.plan_budget
+            pairs.sort(key=lambda pair: self._planning_priority(pair[2], pair[3], perceived_map))
+        candidates = []
+        deferred = set()
+        planned = self.evaluations
+        for agent_order, victim_order, agent, victim in pairs:
+            if deadline is not None and self.evaluations > planned and time.perf_counter() > deadline:
+                entry = self._scored_task(agent, victim, drones, perceived_map, changed, plan=False)
+            else:
+                entry = self._scored_task(agent, victim, drones, perceived_map, changed)
+            if entry is None:
+                deferred.add((id(agent), id(victim)))
+            elif entry.path_to_victim is not None:
+                candidates.append((-entry.score, agent_order, victim_order, entry))
+        self.planning_rounds += 1
+        self.budget_hits += bool(deferred)
+        self.deferred = deferred
+        self._prune_table()
+        if not candidates:
+            return None
+        best = min(candidates)[3]
+        return {
+            'agent': best.agent,
+            'victim': best.victim,
+            'path': best.path,
+            'score': best.score,
+            'target': best.victim_position
+        }
+
+    def _planning_priority(self, agent, victim, perceived_map):
+        return ((id(agent), id(victim)) not in self.deferred,
+                abs(agent.x - victim.x) + abs(agent.y - victim.y),
+                -self.compute_danger_level(victim, perceived_map))
+
+    def _changed_region(self, perceived_map, changes=None):
+        """
+        Brings the task table to perceived_map, given changes as take_changes returns them.
+        Returns False if nothing the tasks depend on changed since the last call, otherwise
+        a SummedAreaTable of the changed cells and a new map epoch begins. Changed safety
+        zones (every route to safety may change) or changed layers without a record of
+        their cells clear the table.
+        """
+        versions, self.table_versions = self.table_versions, dict(perceived_map["versions"])
+        stale = [name for name in TASK_LAYERS if name in versions and versions[name] != self.table_versions[name]]
+        if not stale:
+            return False
+        if changes is None or "safety" in stale or any(name not in changes for name in stale):
+            self.task_table.clear()
+            self.safety_routes.clear()
+            return False
+        mask = np.zeros(perceived_map["obstacles"].shape, dtype=bool)
+        for name in stale:
+            cells = changes[name]
+            mask[cells[:, 0], cells[:, 1]] = True
+        if not mask.any():
+            return False
+        self.map_epoch += 1
+        return SummedAreaTable(mask)
+
+    def _unchanged(self, epoch, cells, changed):
+        """
+        Whether data last checked in map epoch epoch is still valid: either no diff came
+        since, or only this round's, and it has no changes near cells. Entries that sat out
+        a diff (their pair was not a candidate that round) are stale.
+        """
+        if epoch == self.map_epoch:
+            return True
+        return epoch == self.map_epoch - 1 and bool(changed) and not near_changes(cells, changed)
+
+    def _scored_task(self, agent, victim, drones, perceived_map, changed, plan=True):
+        """
+        The task table entry for (agent, victim), scored again only if it went stale.
+        Without plan, a stale entry is not planned again and None is returned instead.
+        """
+        key = (id(agent), id(victim))
+        path_to_safety = self._safety_route(victim, perceived_map, changed, plan)
+        if path_to_safety is _UNPLANNED:
+            return None
+        entry = self.task_table.get(key)
+        if entry is not None:
+            if (entry.victim_position != (victim.x, victim.y) or entry.path_to_safety is not path_to_safety
+                    or not self._unchanged(entry.epoch, entry.cells, changed)):
+                entry = None
+            else:
+                entry.epoch = self.map_epoch
+            if entry is not None and entry.agent_position != (agent.x, agent.y):
+                entry = self._advance(entry, agent, victim, perceived_map)
+        if entry is None:
+            if not plan:
+                self.task_table.pop(key, None)
+                return None
+            self.evaluations += 1
+            path_to_victim = None
+            if path_to_safety:
+                path_to_victim = find_path(perceived_map, (agent.x, agent.y), (victim.x, victim.y),
+                                           agent_mode=True, weighted=True)
+            if path_to_victim:
+                path_to_victim = list(path_to_victim)
+                entry = _ScoredTask(agent, victim, path_to_victim, path_to_safety,
+                                    self._score(path_to_victim + path_to_safety, victim, agent, perceived_map),
+                                    self.map_epoch)
+            else:
+                entry = _ScoredTask(agent, victim, None, path_to_safety, None, self.map_epoch)
+            self.task_table[key] = entry
+        else:
+            self.reused += 1
+        return entry
+
+    def _safety_route(self, victim, perceived_map, changed, plan=True):
+        """
+        compute_optimal_route from the victim's cell, shared by all its pairs and kept
+        until the victim moves or the map changes near the route. Without plan, a stale
+        route is not recomputed and _UNPLANNED is returned.
+        """
+        cached = self.safety_routes.get(id(victim))
+        position = (victim.x, victim.y)
+        if cached is not None and cached[0] == position and self._unchanged(cached[3], cached[2], changed):
+            cached[3] = self.map_epoch
+            return cached[1]
+        if not plan:
+            self.safety_routes.pop(id(victim), None)
+            return _UNPLANNED
+        route = compute_optimal_route(position, perceived_map)
+        self.safety_routes[id(victim)] = [position, route, np.array([position] + (route or [])), self.map_epoch]
+        return route
+
+    def _advance(self, entry, agent, victim, perceived_map):
+        """
+        entry for an agent that moved: if it is still on the path to the victim, the rest
+        of that path is the new one (a best route stays best from any cell along it) and
+        only the score is recomputed; otherwise None.
+        """
+        position = (agent.x, agent.y)
+        if not entry.path_to_victim or position not in entry.path_to_victim:
+            return None
+        rest = entry.path_to_victim[entry.path_to_victim.index(position) + 1:]
+        if not rest:
+            advanced = _ScoredTask(agent, victim, None, entry.path_to_safety, None, self.map_epoch)
+        else:
+            advanced = _ScoredTask(agent, victim, rest, entry.path_to_safety,
+                                   self._score(rest + entry.path_to_safety, victim, agent, perceived_map),
+                                   self.map_epoch)
+        self.task_table[(id(agent), id(victim))] = advanced
+        return advanced
+
+    def _score(self, path, victim, agent, perceived_map):
+        if self.use_rl_selection and self.rl_model is not None:
+            return self.rl_model.predict(path)  # Stub: replace with actual RL inference
+        return self.evaluate_path(path, victim, agent, perceived_map)
+
+    def _prune_table(self):
+        """
+        Drops task table entries for dead agents and for rescued or dead victims.
+        """
+        for key, entry in list(self.task_table.items()):
+            if entry.agent.remaining_life <= 0 or entry.victim.rescued or entry.victim.remaining_life <= 0:
+                del self.task_table[key]
+                self.safety_routes.pop(key[1], None)
+
+    def select_tasks(self, agents, victims, drones, perceived_map, index=None, changes=None):
+        """
+        The tasks to hand out this round: one per idle agent from assign_tasks in
+        assignment mode, otherwise the single best task of select_task (if any).
+        changes is the round's take_changes record (see select_task).
+        """
+        if self.assignment_mode:
+            self._changed_region(perceived_map, changes)  # keeps the task table in step
+            return self.assign_tasks(agents, victims, drones, perceived_map)
+        task = self.select_task(agents, victims, drones, perceived_map, index, changes)
+        return [task] if task else []
+
+    def assign_tasks(self, agents, victims, drones, perceived_map):
+        """
+        Matches every idle agent (alive, without a task) to a different victim in one pass.
+        The cost of a pair is the agent's step distance to the victim (one distance field
+        per agent) plus the victim's step distance to safety (the shared exit field); the
+        minimum-cost matching is found with min_cost_assignment. Victims that are rescued,
+        dead, being guided or already targeted are left out, as are unreachable pairs.
+        """
+        targeted = {id(agent.current_task['victim']) for agent in agents
+                    if agent.current_task and agent.current_task.get('victim') is not None}
+        idle = [agent for agent in agents if agent.remaining_life > 0 and agent.alive and not agent.current_task]
+        waiting = [victim for victim in victims if not victim.rescued and victim.remaining_life > 0
+                   and not victim.being_guided and id(victim) not in targeted]
+        if not idle or not waiting:
+            return []
+        exits = exit_field(perceived_map)
+        fields = [agent_field(perceived_map, agent, max(DERIVED_CACHE_SIZE, len(agents))) for agent in idle]
+        positions = [(victim.x, victim.y) for victim in waiting]
+        height = perceived_map["obstacles"].shape[1]
+        flat = [x * height + y for x, y in positions]
+        exit_dist = np.array([exits.dist[i] for i in flat], dtype=np.float64)
+        cost = np.array([[field.dist[i] for i in flat] for field in fields], dtype=np.float64)
+        unreachable = (cost < 0) | (exit_dist < 0)
+        cost += exit_dist
+        # Unreachable pairs cost more than any real route, so they are only used when
+        # nothing else is left, and are then dropped.
+        cost[unreachable] = 2 * len(idle) * perceived_map["obstacles"].size + 1
+        tasks = []
+        for row, column in min_cost_assignment(cost):
+            if unreachable[row, column]:
+                continue
+            agent, victim = idle[row], waiting[column]
+            cells = [positions[column]] + fields[row].route(positions[column])
+            path = cells[::-1][1:] + exits.route(positions[column])
+            if self.use_rl_selection and self.rl_model is not None:
+                score = self.rl_model.predict(path)  # Stub: replace with actual RL inference
+            else:
+                score = self.evaluate_path(path, victim, agent, perceived_map)
+            tasks.append({
+                'agent': agent,
+                'victim': victim,
+                'path': path,
+                'score': score,
+                'target': (victim.x, victim.y)
+            })
+        return tasks
@@ -1,38 +1,148 @@
 import time
-from config import GRID_WIDTH, GRID_HEIGHT
+import numpy as np
+from collections.abc import Mapping
+from types import MappingProxyType
+from map import new_layer, touch_layers, patch_sight_layer
+
+# Report slices fused into the perceived layer of the same name.
+FUSED_LAYERS = ("hazards", "obstacles", "safety")
+
+class MapSnapshot(Mapping):
+    """
+    Immutable view of the perceived map at one point in time, readable like the map
+    itself (snapshot["hazards"][x][y], snapshot["versions"]). Layers are read-only views
+    of arrays the Communicator no longer writes to, so planners can keep working on a
+    snapshot while new reports are fused. version grows with every new snapshot.
+    """
+    def __init__(self, layers, version):
+        self.version = version
+        self._layers = {}
+        for name, value in layers.items():
+            if name == "versions":
+                self._layers[name] = MappingProxyType(dict(value))
+            else:
+                view = value.view()
+                view.setflags(write=False)
+                self._layers[name] = view
+
+    def __getitem__(self, name):
+        return self._layers[name]
+
+    def __iter__(self):
+        return iter(self._layers)
+
+    def __len__(self):
+        return len(self._layers)
 
 class Communicator:
-    def __init__(self, true_map, use_rl_prediction=False):
+    def __init__(self, true_map, use_rl_prediction=False, decay_rate=0.05):
         self.true_map = true_map
         self.use_rl_prediction = use_rl_prediction
+        self.decay_rate = decay_rate  # confidence points lost per second since a cell was observed
         self.perceived_map = {
-            "obstacles": [row[:] for row in true_map["obstacles"]],
-            "safety": [row[:] for row in true_map["safety"]],
-            "hazards": [row[:] for row in true_map["hazards"]],
-            "sight": [row[:] for row in true_map["sight"]],
-            "timestamps": [[None for _ in range(GRID_HEIGHT)] for _ in range(GRID_WIDTH)],
-            "confidence": [[0 for _ in range(GRID_HEIGHT)] for _ in range(GRID_WIDTH)]
+            "obstacles": true_map["obstacles"].copy(),
+            "safety": true_map["safety"].copy(),
+            "hazards": true_map["hazards"].copy(),
+            "sight": true_map["sight"].copy(),
+            "timestamps": np.full(true_map["hazards"].shape, np.nan),  # NaN = never updated
+            "observed_confidence": new_layer("confidence"),  # as reported, at its timestamp
+            "versions": dict(true_map["versions"])  # identical content, identical versions
         }
+        self.changes = {}  # layer name -> list of (N, 2) arrays of changed cells, see take_changes
+        self._snapshot = None
+        self._snapshot_count = 0
+        self._shared = set()  # perceived layers the latest snapshot still shares
+        self._modified = True
+
+    def _writable(self, name):
+        """
+        The perceived layer to write to; copied first if the latest snapshot shares it.
+        """
+        if name in self._shared:
+            self.perceived_map[name] = self.perceived_map[name].copy()
+            self._shared.discard(name)
+        self._modified = True
+        return self.perceived_map[name]
+
+    def snapshot(self):
+        """
+        Returns a MapSnapshot of the perceived map as it is now. Nothing is copied here:
+        the snapshot shares the layers, and the Communicator copies a layer only when it
+        writes to it next (copy-on-write). Without writes in between, the same snapshot
+        is returned again.
+        """
+        if self._modified or self._snapshot is None:
+            self._snapshot_count += 1
+            self._snapshot = MapSnapshot(self.perceived_map, self._snapshot_count)
+            self._shared = {name for name in self.perceived_map if name != "versions"}
+            self._modified = False
+        return self._snapshot
 
     def update_from_report(self, report):
         """
-        Update perceived map based on a report (from a drone or agent).
+        Fuses a SensorReport (from a drone or agent) into the perceived map, whole window
+        at once. A cell takes the reported observation when its confidence is at least the
+        current (decayed) confidence of what the map holds, so fresher readings win ties
+        and a weak reading cannot replace a strong recent one. Accepted hazard, obstacle and
+        safety values are written into the perceived layers; layers whose content changed
+        get new versions (sight is patched along with hazards) and the changed cells are
+        recorded for take_changes().
+        """
+        perceived = self.perceived_map
+        window = report.window
+        accept = report.confidence >= self.confidence_field(report.timestamp, window)
+        if not accept.any():
+            return
+        self._writable("timestamps")[window][accept] = report.timestamp
+        self._writable("observed_confidence")[window][accept] = report.confidence[accept]
+        changed_layers = []
+        for name in FUSED_LAYERS:
+            reported = getattr(report, name)
+            differs = accept & (perceived[name][window] != reported)
+            if not differs.any():
+                continue
+            self._writable(name)[window][differs] = reported[differs]
+            cells = np.argwhere(differs) + report.origin
+            self._record(name, cells)
+            changed_layers.append(name)
+            if name == "hazards":
+                self._record("sight", patch_sight_layer(self._writable("sight"), perceived["hazards"], cells))
+                changed_layers.append("sight")
+        touch_layers(perceived, *changed_layers)
+
+    def _record(self, name, cells):
+        self.changes.setdefault(name, []).append(cells)
+
+    def take_changes(self):
+        """
+        Returns {layer name: (N, 2) array of cells} changed (by fusion or prediction) since
+        the last call and starts a new record, so consumers can react to deltas instead of
+        rescanning. Every layer whose version moved has an entry. One consumer should drain
+        the record each round (the guidance loops hand it to the Commander).
+        """
+        changes = {name: np.unique(np.concatenate(parts), axis=0) for name, parts in self.changes.items()}
+        self.changes = {}
+        return changes
+
+    def confidence_at(self, i, j, now=None):
+        """
+        Current confidence of one cell: what was observed, less decay_rate per second
+        since then. Computed on read, so decay does not depend on how often it is asked for.
         """
-        for (i, j), cell_info in report.items():
-            self.perceived_map["timestamps"][i][j] = cell_info["timestamp"]
-            self.perceived_map["confidence"][i][j] = cell_info["confidence"]
+        observed = float(self.perceived_map["observed_confidence"][i][j])
+        timestamp = self.perceived_map["timestamps"][i][j]
+        if np.isnan(timestamp):
+            return observed
+        now = time.time() if now is None else now
+        return max(0.0, observed - self.decay_rate * (now - timestamp))
 
-    def decay_confidence(self, decay_rate=0.05):
+    def confidence_field(self, now=None, window=(slice(None), slice(None))):
         """
-        Decay confidence in cells based on time elapsed.
+        confidence_at for the whole grid (or a window of it) in one vectorized pass.
         """
-        current_time = time.time()
-        for i in range(GRID_WIDTH):
-            for j in range(GRID_HEIGHT):
-                ts = self.perceived_map["timestamps"][i][j]
-                if ts is not None:
-                    elapsed = current_time - ts
-                    self.perceived_map["confidence"][i][j] = max(0, self.perceived_map["confidence"][i][j] - decay_rate * elapsed)
+        now = time.time() if now is None else now
+        elapsed = np.nan_to_num(now - self.perceived_map["timestamps"][window], nan=0.0)
+        return np.maximum(0, self.perceived_map["observed_confidence"][window] - self.decay_rate * elapsed)
 
     def predict_cell(self, i, j):
         """
@@ -46,10 +156,14 @@ class Communicator:
 
     def update_perceived_map(self):
         """
-        Update the perceived map: decay confidence and predict cells with no update.
+        Update the perceived map: predict cells with no update. (Confidence decays on read.)
         """
-        self.decay_confidence()
-        for i in range(GRID_WIDTH):
-            for j in range(GRID_HEIGHT):
-                if self.perceived_map["timestamps"][i][j] is None:
-                    self.perceived_map["hazards"][i][j] = self.predict_cell(i, j)
+        hazards = self.perceived_map["hazards"]
+        changed = [(i, j) for i, j in zip(*np.nonzero(np.isnan(self.perceived_map["timestamps"])))
+                   if self.predict_cell(i, j) != hazards[i][j]]
+        if changed:
+            cells = np.array(changed)
+            self._writable("hazards")[cells[:, 0], cells[:, 1]] = [self.predict_cell(i, j) for i, j in changed]
+            self._record("hazards", cells)
+            self._record("sight", patch_sight_layer(self._writable("sight"), self.perceived_map["hazards"], cells))
+            touch_layers(self.perceived_map, "hazards", "sight")
@@ -7,6 +7,17 @@ CELL_SIZE = 15
 INITIAL_HAZARD_COUNT = 20
 OBSTACLE_COUNT = 800
 SPREAD_OPPORTUNITY = 0.1
+EVOLVE_INTERVAL = 5        # rounds between hazard evolution steps
+RANDOM_SEED = None         # seed for the hazard RNG; None draws fresh entropy
+HAZARD_COST_WEIGHT = 5     # planner cost per hazard level of a cell
+SIGHT_COST_WEIGHT = 2      # planner cost per 100% sight obstruction of a cell
+HPA_CLUSTER_SIZE = 16      # cluster edge length of the hierarchical planner
+HPA_MIN_CELLS = 250000     # grids this large route unweighted, obstacle-aware queries hierarchically
+SPATIAL_BUCKET_SIZE = 8    # cell edge length of the victim/agent spatial index buckets
+COMMANDER_CANDIDATES = 8   # nearest victims per agent the commander scores; this prunes which
+                           # victims are considered: farther ones are skipped even if they'd score higher
+COMMANDER_ASSIGNMENT = False  # True: match every idle agent to a victim each round
+COMMANDER_PLAN_BUDGET = None  # seconds of task planning per round; None plans every candidate
 
 # Colors
 WHITE = (255, 255, 255)
@@ -20,7 +31,14 @@ LIGHT_RED = (255, 200, 200)
 MEDIUM_RED = (255, 100, 100)
 BRIGHT_RED = (255, 0, 0)
 
-# Initialize Pygame screen
-pygame.init()
-screen = pygame.display.set_mode((GRID_WIDTH * CELL_SIZE, GRID_HEIGHT * CELL_SIZE))
-pygame.display.set_caption("Disaster Response Simulation")
+# Pygame screen, opened on demand so headless runs never need a display
+screen = None
+
+def init_display():
+    global screen
+    if screen is None:
+        pygame.init()
+        screen = pygame.display.set_mode((GRID_WIDTH * CELL_SIZE, GRID_HEIGHT * CELL_SIZE))
+        pygame.display.set_caption("Disaster Response Simulation")
+    return screen
+
@@ -1,6 +1,7 @@
 class EthicsChecker:
-    def __init__(self):
+    def __init__(self, interactive=True):
         self.max_risk_threshold = 50  # Example threshold
+        self.interactive = interactive  # False: never block on input(), reject flagged tasks
 
     def check_decision(self, task):
         """
@@ -20,7 +21,7 @@ class EthicsChecker:
         """
         print("Ethics Checker flagged task:")
         print(task)
-        decision = input("Approve this task? (y/n): ")
+        decision = input("Approve this task? (y/n): ") if self.interactive else "n"
         if decision.lower() == "y":
             return task
         else:
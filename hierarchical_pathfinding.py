@@ -0,0 +1,265 @@
+import numpy as np
+from collections import deque
+from heapq import heappop, heappush
+from config import HPA_CLUSTER_SIZE
+
+# Border segments up to this long get a single transition in their middle,
+# longer ones get one at each end.
+MAX_SINGLE_TRANSITION = 5
+
+class HierarchicalPlanner:
+    """
+    HPA* planner for large grids. The map is split into square clusters; entrances
+    between neighbouring clusters become abstract nodes, connected by their step
+    distances inside each cluster. A query searches this small abstract graph and then
+    refines each abstract edge with a search confined to one cluster. Routes use
+    a_star's format (start excluded, goal included, [] if unreachable) but are only
+    near-optimal: they pass through fixed transition cells on each border, so small
+    clusters detour more (up to about 1.4x the a_star length on random grids with 3-8
+    cell clusters for routes spanning four or more clusters). Only unit step costs are
+    modelled; weighted queries are left to a_star. When obstacles change, only the
+    clusters touching the changed cells are rebuilt.
+    """
+    def __init__(self, grid, cluster_size=HPA_CLUSTER_SIZE):
+        self.cluster_size = cluster_size
+        self.grid = np.array(grid, dtype=np.uint8)
+        self.width, self.height = self.grid.shape
+        self.blocked = self.grid.tobytes()
+        self.clusters_x = -(-self.width // cluster_size)
+        self.clusters_y = -(-self.height // cluster_size)
+        self.version = None
+        self.borders = {}   # (cluster, right/lower neighbour) -> [(cell, cell across the border)]
+        self.partners = {}  # entrance cell -> set of entrance cells across a border
+        self.intra = {}     # cluster -> {entrance: {entrance in the same cluster: steps}}
+        self._rebuild([(cx, cy) for cx in range(self.clusters_x) for cy in range(self.clusters_y)])
+
+    def cluster_of(self, cell):
+        return (cell[0] // self.cluster_size, cell[1] // self.cluster_size)
+
+    def _box(self, cluster):
+        size = self.cluster_size
+        return (cluster[0] * size, cluster[1] * size,
+                min((cluster[0] + 1) * size, self.width), min((cluster[1] + 1) * size, self.height))
+
+    def _free(self, x, y):
+        return self.blocked[x * self.height + y] != 1
+
+    def update(self, grid, version=None):
+        """
+        Brings the planner in line with grid, rebuilding only the clusters whose cells
+        changed (and the entrances/connections of their neighbours).
+        """
+        if version is not None and version == self.version:
+            return
+        self.version = version
+        changed = np.argwhere(self.grid != grid)
+        if len(changed) == 0:
+            return
+        self.grid[...] = grid
+        self.blocked = self.grid.tobytes()
+        self._rebuild({self.cluster_of(cell) for cell in changed.tolist()})
+
+    def _rebuild(self, dirty):
+        borders = set()
+        for cx, cy in dirty:
+            for other in ((cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):
+                if 0 <= other[0] < self.clusters_x and 0 <= other[1] < self.clusters_y:
+                    borders.add(min((cx, cy), other) + max((cx, cy), other))
+        touched = set(dirty)
+        for border in borders:
+            for a, b in self.borders.get(border, []):
+                self.partners[a].discard(b)
+                self.partners[b].discard(a)
+            self.borders[border] = self._find_transitions(border[:2], border[2:])
+            for a, b in self.borders[border]:
+                self.partners.setdefault(a, set()).add(b)
+                self.partners.setdefault(b, set()).add(a)
+            touched.update((border[:2], border[2:]))
+        for cluster in touched:
+            self.intra[cluster] = self._connect(cluster)
+
+    def _find_transitions(self, cluster, neighbour):
+        x0, y0, x1, y1 = self._box(cluster)
+        if neighbour[0] != cluster[0]:
+            pairs = [((x1 - 1, y), (x1, y)) for y in range(y0, y1)]
+        else:
+            pairs = [((x, y1 - 1), (x, y1)) for x in range(x0, x1)]
+        transitions, segment = [], []
+        for pair in pairs + [None]:
+            if pair is not None and self._free(*pair[0]) and self._free(*pair[1]):
+                segment.append(pair)
+                continue
+            if len(segment) > MAX_SINGLE_TRANSITION:
+                transitions.extend((segment[0], segment[-1]))
+            elif segment:
+                transitions.append(segment[len(segment) // 2])
+            segment = []
+        return transitions
+
+    def _entrances(self, cluster):
+        return {cell for cell in self._border_cells(cluster) if self.partners.get(cell)}
+
+    def _border_cells(self, cluster):
+        cx, cy = cluster
+        cells = set()
+        for border in ((cx - 1, cy, cx, cy), (cx, cy, cx + 1, cy), (cx, cy - 1, cx, cy), (cx, cy, cx, cy + 1)):
+            for a, b in self.borders.get(border, []):
+                cells.add(a if self.cluster_of(a) == cluster else b)
+        return cells
+
+    def _search_cluster(self, source, cluster):
+        """Breadth-first search from source that never leaves cluster; returns parents."""
+        x0, y0, x1, y1 = self._box(cluster)
+        parents = {source: None}
+        queue = deque([source])
+        while queue:
+            x, y = queue.popleft()
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if x0 <= nx < x1 and y0 <= ny < y1 and (nx, ny) not in parents and self._free(nx, ny):
+                    parents[(nx, ny)] = (x, y)
+                    queue.append((nx, ny))
+        return parents
+
+    def _steps(self, parents, cell):
+        steps = 0
+        while parents[cell] is not None:
+            cell = parents[cell]
+            steps += 1
+        return steps
+
+    def _connect(self, cluster):
+        entrances = self._entrances(cluster)
+        edges = {}
+        for entrance in entrances:
+            parents = self._search_cluster(entrance, cluster)
+            edges[entrance] = {other: self._steps(parents, other)
+                               for other in entrances if other != entrance and other in parents}
+        return edges
+
+    def _refine(self, a, b):
+        """Cell route from a (excluded) to b (included) for one abstract edge."""
+        if abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1:
+            return [b]
+        parents = self._search_cluster(a, self.cluster_of(a))
+        route = []
+        while b != a:
+            route.append(b)
+            b = parents[b]
+        route.reverse()
+        return route
+
+    def _free_neighbours(self, cell):
+        x, y = cell
+        return [(nx, ny) for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1))
+                if 0 <= nx < self.width and 0 <= ny < self.height and self._free(nx, ny)]
+
+    def _start_routes(self, start, goal):
+        """
+        Cell routes from start (excluded) to each entrance it can reach, and to goal if
+        they share a cluster. Free neighbours across the cluster border seed searches of
+        their own clusters too, so a start whose way out leaves its cluster is still linked.
+        """
+        routes = {}
+        seeds = [(start, [])] + [(cell, [cell]) for cell in self._free_neighbours(start)
+                                 if self.cluster_of(cell) != self.cluster_of(start)]
+        for seed, prefix in seeds:
+            cluster = self.cluster_of(seed)
+            parents = self._search_cluster(seed, cluster)
+            targets = self._entrances(cluster) | ({goal} if self.cluster_of(goal) == cluster else set())
+            for target in targets:
+                if target in parents and target != start:
+                    tail = []
+                    cell = target
+                    while cell != seed:
+                        tail.append(cell)
+                        cell = parents[cell]
+                    route = prefix + tail[::-1]
+                    if target not in routes or len(route) < len(routes[target]):
+                        routes[target] = route
+        for other in self.partners.get(start, ()):
+            routes[other] = [other]
+        return routes
+
+    def _goal_routes(self, goal):
+        """
+        Cell routes from each entrance that can reach goal (excluded) to goal (included),
+        seeded across the cluster border the same way as _start_routes.
+        """
+        routes = {}
+        seeds = [(goal, [])] + [(cell, [goal]) for cell in self._free_neighbours(goal)
+                                if self.cluster_of(cell) != self.cluster_of(goal)]
+        for seed, suffix in seeds:
+            cluster = self.cluster_of(seed)
+            parents = self._search_cluster(seed, cluster)
+            for entrance in self._entrances(cluster):
+                if entrance in parents and entrance != goal:
+                    route = []
+                    cell = parents[entrance]
+                    while cell is not None:
+                        route.append(cell)
+                        cell = parents[cell]
+                    route += suffix
+                    if entrance not in routes or len(route) < len(routes[entrance]):
+                        routes[entrance] = route
+        for other in self.partners.get(goal, ()):
+            routes[other] = [goal]
+        return routes
+
+    def find_path(self, start, goal):
+        if start == goal or not self._free(*goal):
+            return []
+        start_routes = self._start_routes(start, goal)
+        goal_routes = self._goal_routes(goal)
+
+        def neighbours(node):
+            if node == start:
+                return [(other, len(route)) for other, route in start_routes.items()]
+            edges = list(self.intra[self.cluster_of(node)].get(node, {}).items())
+            edges.extend((other, 1) for other in self.partners.get(node, ()))
+            if node in goal_routes:
+                edges.append((goal, len(goal_routes[node])))
+            return edges
+
+        cost = {start: 0}
+        came_from = {}
+        open_set = [(abs(goal[0] - start[0]) + abs(goal[1] - start[1]), start)]
+        while open_set:
+            _, node = heappop(open_set)
+            if node == goal:
+                break
+            for other, steps in neighbours(node):
+                new_cost = cost[node] + steps
+                if other not in cost or new_cost < cost[other]:
+                    cost[other] = new_cost
+                    came_from[other] = node
+                    heappush(open_set, (new_cost + abs(goal[0] - other[0]) + abs(goal[1] - other[1]), other))
+        else:
+            return []
+
+        abstract = [goal]
+        while abstract[-1] != start:
+            abstract.append(came_from[abstract[-1]])
+        abstract.reverse()
+        route = []
+        for a, b in zip(abstract, abstract[1:]):
+            if a == start:
+                route.extend(start_routes[b])
+            elif b == goal and a in goal_routes:
+                route.extend(goal_routes[a])
+            else:
+                route.extend(self._refine(a, b))
+        return route
+
+_PLANNERS = {}
+
+def hierarchical_planner(layers):
+    """
+    Returns the HierarchicalPlanner for layers' obstacle grid, brought up to date with
+    the current obstacle version.
+    """
+    grid = layers["obstacles"]
+    planner = _PLANNERS.get(grid.shape)
+    if planner is None:
+        planner = _PLANNERS[grid.shape] = HierarchicalPlanner(grid)
+    planner.update(grid, layers["versions"]["obstacles"])
+    return planner
@@ -1,13 +1,79 @@
 import pygame
+import itertools
 import random
-from config import (GRID_WIDTH, GRID_HEIGHT, INITIAL_HAZARD_COUNT, OBSTACLE_COUNT, SPREAD_OPPORTUNITY,
-                    CELL_SIZE, WHITE, RED, GREEN, GRAY, BLACK, LIGHT_RED, MEDIUM_RED, BRIGHT_RED, screen)
+import numpy as np
+from config import (GRID_WIDTH, GRID_HEIGHT, INITIAL_HAZARD_COUNT, OBSTACLE_COUNT, SPREAD_OPPORTUNITY, RANDOM_SEED,
+                    CELL_SIZE, WHITE, RED, GREEN, GRAY, BLACK, LIGHT_RED, MEDIUM_RED, BRIGHT_RED)
+
+# Storage type of every map layer. Layers are (GRID_WIDTH, GRID_HEIGHT) arrays so
+# existing layers[name][x][y] lookups keep working while hot paths use whole-array ops.
+LAYER_DTYPES = {
+    "obstacles": np.uint8,
+    "safety": np.uint8,
+    "hazards": np.uint8,
+    "sight": np.uint8,
+    "confidence": np.float32,
+}
+
+# Sight obstruction (%) caused by a hazard of a given level at a given Manhattan distance.
+SIGHT_OBSTRUCTION = np.array([
+    [0, 0, 0],
+    [20, 0, 0],
+    [50, 20, 0],
+    [80, 50, 20],
+], dtype=np.uint8)
+SIGHT_RADIUS = SIGHT_OBSTRUCTION.shape[1] - 1
+SIGHT_OFFSETS = np.array([(dx, dy) for dx in range(-SIGHT_RADIUS, SIGHT_RADIUS + 1)
+                          for dy in range(-SIGHT_RADIUS, SIGHT_RADIUS + 1)
+                          if abs(dx) + abs(dy) <= SIGHT_RADIUS])
+SIGHT_DISTANCES = np.abs(SIGHT_OFFSETS).sum(axis=1)
+
+# Hazard evolution: spread chance multiplier per level (indexed by level), the
+# neighbour offsets a hazard can spread to, and per-step escalation/decay chances.
+SPREAD_MULTIPLIER = np.array([0.0, 0.1, 0.5, 1.0])
+SPREAD_DIRECTIONS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
+ESCALATION_CHANCE = 0.10
+DECAY_CHANCE = 0.05
+HAZARD_RNG = np.random.default_rng(RANDOM_SEED)
+
+def seed_hazard_rng(seed):
+    global HAZARD_RNG
+    HAZARD_RNG = np.random.default_rng(seed)
+
+# Every layer change is stamped with a fresh, globally unique version number, so
+# derived data (distance fields, path caches) can be cached by version alone.
+_layer_versions = itertools.count(1)
+
+def new_version():
+    return next(_layer_versions)
+
+def touch_layers(layers, *names):
+    """
+    Records that the named layers changed by giving them fresh versions.
+    """
+    for name in names:
+        layers["versions"][name] = new_version()
+
+def new_layer(name, fill=0):
+    """
+    Allocates a contiguous grid-sized array for the named layer.
+    """
+    return np.full((GRID_WIDTH, GRID_HEIGHT), fill, dtype=LAYER_DTYPES[name])
+
+def shifted_slices(dx, dy, shape):
+    """
+    Returns (target, source) slice pairs so that array[target] lines up with
+    array[source] moved by (dx, dy), clipped to the grid.
+    """
+    width, height = shape
+    target = (slice(max(dx, 0), width + min(dx, 0)), slice(max(dy, 0), height + min(dy, 0)))
+    source = (slice(max(-dx, 0), width - max(dx, 0)), slice(max(-dy, 0), height - max(dy, 0)))
+    return target, source
 
 def create_map():
-    obstacles = [[0 for _ in range(GRID_HEIGHT)] for _ in range(GRID_WIDTH)]
-    safety = [[0 for _ in range(GRID_HEIGHT)] for _ in range(GRID_WIDTH)]
-    hazards = [[0 for _ in range(GRID_HEIGHT)] for _ in range(GRID_WIDTH)]
-    sight_obstruction = [[0 for _ in range(GRID_HEIGHT)] for _ in range(GRID_WIDTH)]
+    obstacles = new_layer("obstacles")
+    safety = new_layer("safety")
+    hazards = new_layer("hazards")
 
     placed = 0
     while placed < OBSTACLE_COUNT:
@@ -17,10 +83,10 @@ def create_map():
             obstacles[x][y] = 1
             placed += 1
 
-    for x in range(GRID_WIDTH):
-        for y in range(GRID_HEIGHT):
-            if x == 0 or x == GRID_WIDTH - 1 or y == 0 or y == GRID_HEIGHT - 1:
-                safety[x][y] = 1
+    safety[0, :] = 1
+    safety[-1, :] = 1
+    safety[:, 0] = 1
+    safety[:, -1] = 1
 
     placed = 0
     while placed < INITIAL_HAZARD_COUNT:
@@ -30,163 +96,206 @@ def create_map():
             hazards[x][y] = random.choice([1, 2, 3])
             placed += 1
 
-    for x in range(GRID_WIDTH):
-        for y in range(GRID_HEIGHT):
-            level = hazards[x][y]
-            if level == 1:
-                sight_obstruction[x][y] = max(sight_obstruction[x][y], 20)
-            elif level == 2:
-                sight_obstruction[x][y] = max(sight_obstruction[x][y], 50)
-                for dx in range(-1, 2):
-                    for dy in range(-1, 2):
-                        if abs(dx) + abs(dy) == 1:
-                            nx, ny = x + dx, y + dy
-                            if 0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT:
-                                sight_obstruction[nx][ny] = max(sight_obstruction[nx][ny], 20)
-            elif level == 3:
-                sight_obstruction[x][y] = max(sight_obstruction[x][y], 80)
-                for dx in range(-1, 2):
-                    for dy in range(-1, 2):
-                        if abs(dx) + abs(dy) == 1:
-                            nx, ny = x + dx, y + dy
-                            if 0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT:
-                                sight_obstruction[nx][ny] = max(sight_obstruction[nx][ny], 50)
-                for dx in range(-2, 3):
-                    for dy in range(-2, 3):
-                        if abs(dx) + abs(dy) == 2:
-                            nx, ny = x + dx, y + dy
-                            if 0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT:
-                                sight_obstruction[nx][ny] = max(sight_obstruction[nx][ny], 20)
-
     return {
         "obstacles": obstacles,
         "safety": safety,
         "hazards": hazards,
-        "sight": sight_obstruction
+        "sight": update_sight_layer(hazards),
+        "versions": {name: new_version() for name in ("obstacles", "safety", "hazards", "sight")}
     }
 
-def draw_map(layers):
-    for x in range(GRID_WIDTH):
-        for y in range(GRID_HEIGHT):
-            pygame.draw.rect(screen, WHITE, (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-            pygame.draw.rect(screen, GRAY, (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE), 1)
+HAZARD_COLORS = {1: LIGHT_RED, 2: MEDIUM_RED, 3: BRIGHT_RED}
+# How many cells to the right/below a cell's sight label can spill over.
+GLYPH_REACH = (2, 1)
+
+_font = None
+_glyphs = {}
 
-    obstacles = layers["obstacles"]
-    for x in range(GRID_WIDTH):
-        for y in range(GRID_HEIGHT):
-            if obstacles[x][y] == 1:
-                pygame.draw.rect(screen, BLACK, (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+def text_glyph(text, color=BLACK):
+    """
+    Returns a cached rendered text surface; labels such as sight percentages and
+    life values come from a small fixed set, so each is only rendered once.
+    """
+    global _font
+    glyph = _glyphs.get((text, color))
+    if glyph is None:
+        if _font is None:
+            _font = pygame.font.SysFont(None, 18)
+        glyph = _glyphs[(text, color)] = _font.render(text, True, color)
+    return glyph
 
-    safety = layers["safety"]
-    for x in range(GRID_WIDTH):
-        for y in range(GRID_HEIGHT):
-            if safety[x][y] == 1:
-                pygame.draw.rect(screen, GREEN, (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+def cell_rect(x, y):
+    return pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
 
+class MapRenderer:
+    """
+    Draws the map and sprites onto a surface, touching only what changed since the
+    previous frame. The obstacle/safety/grid background is pre-rendered once per
+    layer version, hazard cells and sight labels are redrawn only where their values
+    changed, and only the dirty rectangles are pushed to the display.
+    """
+    def __init__(self, surface):
+        self.surface = surface
+        self.background = None
+        self.map_surface = None
+        self.static_key = None
+        self.drawn_hazards = None
+        self.drawn_sight = None
+        self.sprite_rects = []
+
+    def invalidate(self):
+        """Forces a full redraw on the next frame (e.g. after the screen was overwritten)."""
+        self.static_key = None
+
+    def _build_background(self, layers):
+        self.background = pygame.Surface((GRID_WIDTH * CELL_SIZE, GRID_HEIGHT * CELL_SIZE))
+        for x in range(GRID_WIDTH):
+            for y in range(GRID_HEIGHT):
+                pygame.draw.rect(self.background, WHITE, cell_rect(x, y))
+                pygame.draw.rect(self.background, GRAY, cell_rect(x, y), 1)
+        for x, y in zip(*np.nonzero(layers["obstacles"] == 1)):
+            pygame.draw.rect(self.background, BLACK, cell_rect(x, y))
+        for x, y in zip(*np.nonzero(layers["safety"] == 1)):
+            pygame.draw.rect(self.background, GREEN, cell_rect(x, y))
+
+    def _draw_cells(self, cells, hazards, sight):
+        """Redraws the given cells of map_surface, including labels spilling into them."""
+        reach_x, reach_y = GLYPH_REACH
+        for x, y in cells:
+            rect = cell_rect(x, y)
+            self.map_surface.set_clip(rect)
+            self.map_surface.blit(self.background, rect, rect)
+            if hazards[x][y] in HAZARD_COLORS:
+                self.map_surface.fill(HAZARD_COLORS[hazards[x][y]], rect)
+            for gx in range(max(0, x - reach_x), x + 1):
+                for gy in range(max(0, y - reach_y), y + 1):
+                    if sight[gx][gy] > 0:
+                        self.map_surface.blit(text_glyph(f"{sight[gx][gy]}%"),
+                                              (gx * CELL_SIZE + 2, gy * CELL_SIZE + 2))
+        self.map_surface.set_clip(None)
+
+    def render(self, layers, sprites):
+        """
+        Draws layers and then sprites (objects whose render(surface) returns the Rect
+        it drew, or None) and updates only the changed parts of the display.
+        Returns the list of updated rectangles.
+        """
+        hazards, sight = layers["hazards"], layers["sight"]
+        static_key = (layers["versions"]["obstacles"], layers["versions"]["safety"])
+        if static_key != self.static_key:
+            self._build_background(layers)
+            self.map_surface = self.background.copy()
+            for x, y in zip(*np.nonzero(hazards)):
+                self.map_surface.fill(HAZARD_COLORS[hazards[x][y]], cell_rect(x, y))
+            for x, y in zip(*np.nonzero(sight)):
+                self.map_surface.blit(text_glyph(f"{sight[x][y]}%"), (x * CELL_SIZE + 2, y * CELL_SIZE + 2))
+            self.static_key = static_key
+            self.surface.blit(self.map_surface, (0, 0))
+            dirty = [self.map_surface.get_rect()]
+        else:
+            changed = np.argwhere((hazards != self.drawn_hazards) | (sight != self.drawn_sight))
+            # A changed label may have spilled into the cells to its right and below.
+            reach_x, reach_y = GLYPH_REACH
+            cells = set()
+            for x, y in changed.tolist():
+                for dx in range(reach_x + 1):
+                    for dy in range(reach_y + 1):
+                        if x + dx < GRID_WIDTH and y + dy < GRID_HEIGHT:
+                            cells.add((x + dx, y + dy))
+            self._draw_cells(sorted(cells), hazards, sight)
+            dirty = [cell_rect(x, y) for x, y in cells] + self.sprite_rects
+            for rect in dirty:
+                self.surface.blit(self.map_surface, rect, rect)
+        self.drawn_hazards = hazards.copy()
+        self.drawn_sight = sight.copy()
+
+        bounds = self.map_surface.get_rect()
+        self.sprite_rects = [rect.clip(bounds) for rect in (sprite.render(self.surface) for sprite in sprites) if rect]
+        dirty.extend(self.sprite_rects)
+        pygame.display.update(dirty)
+        return dirty
+
+def evolve_situation(layers, rng=None):
+    """
+    Advances the hazard field by one step. Every burning cell may spread its level to
+    each of its 8 neighbours (the (1, 1) diagonal is favoured), then every burning cell
+    that was not overrun may escalate and/or decay. All random numbers for the step are
+    drawn in one call from rng (HAZARD_RNG by default).
+    Returns the (x, y) coordinates of the hazard cells that changed, as an (N, 2) array.
+    """
+    rng = HAZARD_RNG if rng is None else rng
     hazards = layers["hazards"]
-    for x in range(GRID_WIDTH):
-        for y in range(GRID_HEIGHT):
-            level = hazards[x][y]
-            if level == 1:
-                color = LIGHT_RED
-            elif level == 2:
-                color = MEDIUM_RED
-            elif level == 3:
-                color = BRIGHT_RED
-            else:
-                continue
-            pygame.draw.rect(screen, color, (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-
-    sight_obstruction = layers["sight"]
-    font = pygame.font.SysFont(None, 18)
-    for x in range(GRID_WIDTH):
-        for y in range(GRID_HEIGHT):
-            if sight_obstruction[x][y] > 0:
-                text = font.render(f"{sight_obstruction[x][y]}%", True, BLACK)
-                screen.blit(text, (x * CELL_SIZE + 2, y * CELL_SIZE + 2))
-
-def evolve_situation(layers):
-    new_hazards = [element[:] for element in layers["hazards"]]
-    updated = [[False for _ in range(GRID_HEIGHT)] for _ in range(GRID_WIDTH)]
-    for x in range(GRID_WIDTH):
-        for y in range(GRID_HEIGHT):
-            level = layers["hazards"][x][y]
-            if level > 0:
-                for dx in [-1, 0, 1]:
-                    for dy in [-1, 0, 1]:
-                        if dx == 0 and dy == 0:
-                            continue
-                        nx, ny = x + dx, y + dy
-                        if 0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT:
-                            if level == 3:
-                                base_multiplier = 1.0
-                            elif level == 2:
-                                base_multiplier = 0.5
-                            elif level == 1:
-                                base_multiplier = 0.1
-                            if dx == 1 and dy == 1:
-                                effective_chance = base_multiplier * SPREAD_OPPORTUNITY
-                            else:
-                                effective_chance = base_multiplier * SPREAD_OPPORTUNITY * 0.3
-                            if random.random() < effective_chance:
-                                if new_hazards[nx][ny] < level:
-                                    new_hazards[nx][ny] = level
-                                    updated[nx][ny] = True
-    for x in range(GRID_WIDTH):
-        for y in range(GRID_HEIGHT):
-            if updated[x][y]:
-                continue
-            level = new_hazards[x][y]
-            if level > 0:
-                new_level = level
-                if random.random() < 0.10 and level < 3:
-                    new_level = level + 1
-                    updated[x][y] = True
-                if random.random() < 0.05 and new_level > 0:
-                    new_level = new_level - 1
-                    updated[x][y] = True
-                new_hazards[x][y] = new_level
+    xs, ys = np.nonzero(hazards)
+    levels = hazards[xs, ys]
+    draws = rng.random((len(SPREAD_DIRECTIONS) + 2, len(xs)))
+    chance = SPREAD_MULTIPLIER[levels] * SPREAD_OPPORTUNITY
+
+    new_hazards = hazards.copy()
+    spreading = np.zeros_like(hazards)
+    for k, (dx, dy) in enumerate(SPREAD_DIRECTIONS):
+        bias = 1.0 if (dx, dy) == (1, 1) else 0.3
+        hit = draws[k] < chance * bias
+        spreading.fill(0)
+        spreading[xs[hit], ys[hit]] = levels[hit]
+        target, source = shifted_slices(dx, dy, hazards.shape)
+        np.maximum(new_hazards[target], spreading[source], out=new_hazards[target])
+
+    # Cells raised by spreading are left alone; the rest may escalate, then decay.
+    stable = new_hazards[xs, ys] == levels
+    level = levels[stable]
+    level = level + ((draws[-2][stable] < ESCALATION_CHANCE) & (level < 3))
+    level = level - ((draws[-1][stable] < DECAY_CHANCE) & (level > 0))
+    new_hazards[xs[stable], ys[stable]] = level
+
+    changed = np.argwhere(new_hazards != hazards)
     layers["hazards"] = new_hazards
-    layers["sight"] = update_sight_layer(new_hazards)
+    patch_sight_layer(layers["sight"], new_hazards, changed)
+    if len(changed):
+        touch_layers(layers, "hazards", "sight")
+    return changed
 
 def update_sight_layer(hazards):
-    sight_obstruction = [[0 for _ in range(GRID_HEIGHT)] for _ in range(GRID_WIDTH)]
-    for x in range(GRID_WIDTH):
-        for y in range(GRID_HEIGHT):
-            level = hazards[x][y]
-            if level == 1:
-                sight_obstruction[x][y] = max(sight_obstruction[x][y], 20)
-            elif level == 2:
-                sight_obstruction[x][y] = max(sight_obstruction[x][y], 50)
-                for dx in range(-1, 2):
-                    for dy in range(-1, 2):
-                        if abs(dx) + abs(dy) == 1:
-                            nx, ny = x + dx, y + dy
-                            if 0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT:
-                                sight_obstruction[nx][ny] = max(sight_obstruction[nx][ny], 20)
-            elif level == 3:
-                sight_obstruction[x][y] = max(sight_obstruction[x][y], 80)
-                for dx in range(-1, 2):
-                    for dy in range(-1, 2):
-                        if abs(dx) + abs(dy) == 1:
-                            nx, ny = x + dx, y + dy
-                            if 0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT:
-                                sight_obstruction[nx][ny] = max(sight_obstruction[nx][ny], 50)
-                for dx in range(-2, 3):
-                    for dy in range(-2, 3):
-                        if abs(dx) + abs(dy) == 2:
-                            nx, ny = x + dx, y + dy
-                            if 0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT:
-                                sight_obstruction[nx][ny] = max(sight_obstruction[nx][ny], 20)
+    """
+    Rebuilds the sight obstruction layer from the hazard layer. Every hazard obstructs
+    its own cell and, for higher levels, the cells within SIGHT_RADIUS Manhattan distance.
+    """
+    sight_obstruction = np.zeros(hazards.shape, dtype=LAYER_DTYPES["sight"])
+    for (dx, dy), distance in zip(SIGHT_OFFSETS, SIGHT_DISTANCES):
+        target, source = shifted_slices(dx, dy, hazards.shape)
+        np.maximum(sight_obstruction[target], SIGHT_OBSTRUCTION[hazards[source], distance],
+                   out=sight_obstruction[target])
     return sight_obstruction
 
-def find_nearest_safe_zone(grid, x, y):
-    from pathfinding import a_star
-    min_path = []
-    for i in range(GRID_WIDTH):
-        for j in range(GRID_HEIGHT):
-            if grid[i][j] == 2:
-                path = a_star(grid, (x, y), (i, j), agent_mode=True)
-                if path and (not min_path or len(path) < len(min_path)):
-                    min_path = path
-    return min_path[-1] if min_path else None
+def patch_sight_layer(sight_obstruction, hazards, changed):
+    """
+    Updates the sight obstruction layer in place after the hazards at the (N, 2) array of
+    changed cells were modified. Only cells within SIGHT_RADIUS of a changed cell are
+    recomputed, each as the maximum over every hazard that can reach it, so lowered
+    hazards clear their obstruction as well. Returns the (N, 2) array of cells whose
+    obstruction changed.
+    """
+    if len(changed) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    if len(changed) * len(SIGHT_OFFSETS) ** 2 >= hazards.size:
+        # So much changed that a full rebuild is cheaper than patching.
+        rebuilt = update_sight_layer(hazards)
+        moved = np.argwhere(sight_obstruction != rebuilt)
+        sight_obstruction[...] = rebuilt
+        return moved
+    width, height = hazards.shape
+    cells = (changed[:, None, :] + SIGHT_OFFSETS[None, :, :]).reshape(-1, 2)
+    inside = (cells[:, 0] >= 0) & (cells[:, 0] < width) & (cells[:, 1] >= 0) & (cells[:, 1] < height)
+    flat = np.unique(cells[inside, 0] * height + cells[inside, 1])
+    xs, ys = flat // height, flat % height
+    values = np.zeros(len(flat), dtype=sight_obstruction.dtype)
+    for (dx, dy), distance in zip(SIGHT_OFFSETS, SIGHT_DISTANCES):
+        sx, sy = xs - dx, ys - dy
+        ok = (sx >= 0) & (sx < width) & (sy >= 0) & (sy < height)
+        values[ok] = np.maximum(values[ok], SIGHT_OBSTRUCTION[hazards[sx[ok], sy[ok]], distance])
+    moved = sight_obstruction[xs, ys] != values
+    sight_obstruction[xs, ys] = values
+    return np.stack([xs[moved], ys[moved]], axis=1)
+
+def find_nearest_safe_zone(layers, x, y):
+    from pathfinding import exit_field
+    return exit_field(layers).nearest_source((x, y))
@@ -1,5 +1,7 @@
-from queue import PriorityQueue
-from config import GRID_WIDTH, GRID_HEIGHT
+from collections import OrderedDict, deque
+from heapq import heappop, heappush
+from config import HAZARD_COST_WEIGHT, SIGHT_COST_WEIGHT, HPA_MIN_CELLS
+from hierarchical_pathfinding import hierarchical_planner
 from stable_baselines3 import DQN
 import numpy as np
 import os
@@ -18,33 +20,618 @@ except Exception as e:
 def heuristic(a, b):
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
-def a_star(grid, start, goal, agent_mode=False):
-    open_set = PriorityQueue()
-    open_set.put((0, start))
-    came_from = {}
-    cost_so_far = {start: 0}
-    while not open_set.empty():
-        current = open_set.get()[1]
-        if current == goal:
+class _SearchState:
+    """
+    Cost/parent/closed arrays shared by every search over grids of one size. Instead of
+    clearing them, each search bumps the generation and an entry only counts when its
+    stamp matches the current generation.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.generation = 0
+        self.cost = [0] * size
+        self.parent = [-1] * size
+        self.seen = [0] * size
+        self.closed = [0] * size
+        self.expanded = 0  # nodes expanded by the last search
+
+    def next_generation(self):
+        self.generation += 1
+        return self.generation
+
+_search_state = _SearchState(0)
+
+def _get_search_state(size):
+    global _search_state
+    if _search_state.size != size:
+        _search_state = _SearchState(size)
+    return _search_state
+
+def blocked_cells(grid):
+    """
+    Flattens an obstacle grid into bytes indexed by x * height + y (1 = blocked).
+    """
+    return np.ascontiguousarray(grid, dtype=np.uint8).tobytes()
+
+def a_star(grid, start, goal, agent_mode=False, cell_cost=None):
+    """
+    A* over the 4-connected grid. Entering a cell costs cell_cost[x * height + y]
+    (see cost_layer; costs must be >= 1 to keep the Manhattan heuristic admissible)
+    or 1 when no cost layer is given. Cells are flat indices; ties pop in (x, y) order,
+    so routes are deterministic.
+    Returns the route from start (excluded) to goal (included), or [] if there is none.
+    With agent_mode, obstacles in grid are ignored. Unit-cost queries (no cell_cost)
+    go through jump_point_search, which returns routes of the same length.
+    """
+    if cell_cost is None:
+        return jump_point_search(grid, start, goal, agent_mode)
+    width, height = len(grid), len(grid[0])
+    blocked = None if agent_mode else blocked_cells(grid)
+    state = _get_search_state(width * height)
+    generation = state.next_generation()
+    cost, parent, seen, closed = state.cost, state.parent, state.seen, state.closed
+    goal_x, goal_y = goal
+    source = start[0] * height + start[1]
+    target = goal_x * height + goal_y
+    cost[source] = 0
+    parent[source] = -1
+    seen[source] = generation
+    open_set = [(0, source)]
+    expanded = 0
+    while open_set:
+        current = heappop(open_set)[1]
+        if closed[current] == generation:
+            continue
+        if current == target:
+            state.expanded = expanded
+            path = []
+            while current != source:
+                path.append(divmod(current, height))
+                current = parent[current]
+            path.reverse()
+            return path
+        closed[current] = generation
+        expanded += 1
+        x, y = divmod(current, height)
+        current_cost = cost[current]
+        for neighbor, nx, ny, inside in ((current - height, x - 1, y, x > 0),
+                                         (current + height, x + 1, y, x < width - 1),
+                                         (current - 1, x, y - 1, y > 0),
+                                         (current + 1, x, y + 1, y < height - 1)):
+            if not inside or (blocked is not None and blocked[neighbor] == 1):
+                continue
+            new_cost = current_cost + cell_cost[neighbor]
+            if seen[neighbor] != generation or new_cost < cost[neighbor]:
+                seen[neighbor] = generation
+                cost[neighbor] = new_cost
+                parent[neighbor] = current
+                heappush(open_set, (new_cost + abs(goal_x - nx) + abs(goal_y - ny), neighbor))
+    state.expanded = expanded
+    return []
+
+_JUMP_TABLES = OrderedDict()
+JUMP_TABLE_CACHE_SIZE = 8
+
+def _vertical_jumps(blocked, width, height):
+    """
+    Precomputed vertical scans for jump_point_search, cached by the blocked bytes. For
+    each cell and direction dy, jumps[dy][cell] is the first cell along dy with a forced
+    horizontal turn (-1 if none) and ends[dy][cell] the y where that scan stops.
+    """
+    key = (height, blocked)
+    tables = _JUMP_TABLES.get(key)
+    if tables is not None:
+        _JUMP_TABLES.move_to_end(key)
+        return tables
+    size = width * height
+    last_x = size - height
+    jumps = {1: [-1] * size, -1: [-1] * size}
+    ends = {1: [0] * size, -1: [0] * size}
+    for dy, ys in ((1, range(height - 1, -1, -1)), (-1, range(height))):
+        jump, end = jumps[dy], ends[dy]
+        for x in range(0, size, height):
+            for y in ys:
+                cell = x + y
+                ahead = cell + dy
+                if not 0 <= y + dy < height or blocked[ahead] == 1:
+                    end[cell] = y
+                elif (x > 0 and blocked[ahead - height] != 1 and blocked[cell - height] == 1) or \
+                        (x < last_x and blocked[ahead + height] != 1 and blocked[cell + height] == 1):
+                    end[cell] = y + dy
+                    jump[cell] = ahead
+                else:
+                    end[cell] = end[ahead]
+                    jump[cell] = jump[ahead]
+    tables = _JUMP_TABLES[key] = (jumps, ends)
+    if len(_JUMP_TABLES) > JUMP_TABLE_CACHE_SIZE:
+        _JUMP_TABLES.popitem(last=False)
+    return tables
+
+def jump_point_search(grid, start, goal, agent_mode=False):
+    """
+    Jump point search for unit step costs on the 4-connected grid. Horizontal moves
+    come before vertical ones: a horizontal jump stops at a cell from which a vertical
+    scan reaches a jump point, and a vertical jump stops at the goal or where a blocked
+    cell beside it ends (a forced horizontal turn). Vertical scans are table lookups
+    (see _vertical_jumps) and only jump points enter the open set. Routes are optimal
+    and in a_star's format; with agent_mode, obstacles in grid are ignored.
+    """
+    width, height = len(grid), len(grid[0])
+    size = width * height
+    if height == 1:
+        # On a single row the vertical flat step (+-height) is the horizontal one (+-1),
+        # so the scans below cannot tell them apart; plain A* with unit costs instead.
+        return a_star(grid, start, goal, agent_mode, [1] * size)
+    blocked = bytes(size) if agent_mode else blocked_cells(grid)
+    jumps, ends = _vertical_jumps(blocked, width, height)
+    state = _get_search_state(size)
+    generation = state.next_generation()
+    cost, parent, seen, closed = state.cost, state.parent, state.seen, state.closed
+    goal_x, goal_y = goal
+    source = start[0] * height + start[1]
+    target = goal_x * height + goal_y
+    goal_column = goal_x * height
+
+    def jump_vertical(cell, x, dy):
+        # First jump point from cell along dy (the goal or a forced turn), or -1.
+        if x == goal_column:
+            y, end = cell - x, ends[dy][cell]
+            if (y < goal_y <= end) if dy == 1 else (end <= goal_y < y):
+                return target
+        return jumps[dy][cell]
+
+    def jump_horizontal(cell, dx):
+        # dx is +-height; first cell along the row that is a jump point, or -1.
+        while True:
+            cell += dx
+            if cell < 0 or cell >= size or blocked[cell] == 1:
+                return -1
+            if cell == target:
+                return cell
+            x = cell - cell % height
+            if jump_vertical(cell, x, 1) != -1 or jump_vertical(cell, x, -1) != -1:
+                return cell
+
+    cost[source] = 0
+    parent[source] = -1
+    seen[source] = generation
+    open_set = [(0, source)]
+    expanded = 0
+    while open_set:
+        current = heappop(open_set)[1]
+        if closed[current] == generation:
+            continue
+        if current == target:
+            state.expanded = expanded
             path = []
-            while current in came_from:
-                path.append(current)
-                current = came_from[current]
+            while current != source:
+                previous = parent[current]
+                step = 1 if abs(current - previous) < height else height
+                if current < previous:
+                    step = -step
+                while current != previous:
+                    path.append(divmod(current, height))
+                    current -= step
             path.reverse()
             return path
-        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            neighbor = (current[0] + dx, current[1] + dy)
-            if 0 <= neighbor[0] < GRID_WIDTH and 0 <= neighbor[1] < GRID_HEIGHT:
-                if grid[neighbor[0]][neighbor[1]] == 1 and not agent_mode:
-                    continue
-                new_cost = cost_so_far[current] + 1
-                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
-                    cost_so_far[neighbor] = new_cost
-                    priority = new_cost + heuristic(goal, neighbor)
-                    open_set.put((priority, neighbor))
-                    came_from[neighbor] = current
+        closed[current] = generation
+        expanded += 1
+        x = current - current % height
+        y = current - x
+        previous = parent[current]
+        if previous == -1:
+            directions = (height, -height, 1, -1)
+        elif abs(current - previous) >= height:
+            directions = (height if current > previous else -height, 1, -1)
+        else:
+            dy = 1 if current > previous else -1
+            directions = [dy]
+            # A blocked cell beside the previous step forces a horizontal turn here.
+            if x > 0 and blocked[current - height] != 1 and blocked[current - height - dy] == 1:
+                directions.append(-height)
+            if x < size - height and blocked[current + height] != 1 and blocked[current + height - dy] == 1:
+                directions.append(height)
+        for direction in directions:
+            if direction == 1 or direction == -1:
+                jump = jump_vertical(current, x, direction)
+            else:
+                jump = jump_horizontal(current, direction)
+            if jump == -1:
+                continue
+            jump_x, jump_y = divmod(jump, height)
+            new_cost = cost[current] + abs(jump_x * height - x) // height + abs(jump_y - y)
+            if seen[jump] != generation or new_cost < cost[jump]:
+                seen[jump] = generation
+                cost[jump] = new_cost
+                parent[jump] = current
+                heappush(open_set, (new_cost + abs(goal_x - jump_x) + abs(goal_y - jump_y), jump))
+    state.expanded = expanded
     return []
 
+def multi_goal_search(grid, start, goals, cell_cost=None, agent_mode=False):
+    """
+    Dijkstra from start toward a set of goals in one expansion: goals is a grid whose
+    cells equal 1 where a goal is, and entering a cell costs cell_cost[x * height + y]
+    (1 everywhere when None; costs must be non-negative). Stops at the first goal settled,
+    which is the cheapest one. Returns the route in a_star's format, or [] if start is a
+    goal or none is reachable. With agent_mode, obstacles in grid are ignored.
+    """
+    width, height = len(grid), len(grid[0])
+    blocked = None if agent_mode else blocked_cells(grid)
+    is_goal = blocked_cells(goals)
+    state = _get_search_state(width * height)
+    generation = state.next_generation()
+    cost, parent, seen, closed = state.cost, state.parent, state.seen, state.closed
+    source = start[0] * height + start[1]
+    if is_goal[source] == 1:
+        return []
+    cost[source] = 0
+    parent[source] = -1
+    seen[source] = generation
+    open_set = [(0, source)]
+    while open_set:
+        current_cost, current = heappop(open_set)
+        if closed[current] == generation:
+            continue
+        if is_goal[current] == 1:
+            path = []
+            while current != source:
+                path.append(divmod(current, height))
+                current = parent[current]
+            path.reverse()
+            return path
+        closed[current] = generation
+        x, y = divmod(current, height)
+        for neighbor, inside in ((current - height, x > 0), (current + height, x < width - 1),
+                                 (current - 1, y > 0), (current + 1, y < height - 1)):
+            if not inside or (blocked is not None and blocked[neighbor] == 1):
+                continue
+            new_cost = current_cost + (1 if cell_cost is None else cell_cost[neighbor])
+            if seen[neighbor] != generation or new_cost < cost[neighbor]:
+                seen[neighbor] = generation
+                cost[neighbor] = new_cost
+                parent[neighbor] = current
+                heappush(open_set, (new_cost, neighbor))
+    return []
+
+class PathCache:
+    """
+    LRU cache of a_star routes keyed by (start, goal, mode, map version). The latest
+    route toward each (goal, mode, version) is also indexed by cell, so a walker that
+    has only moved along it hits the cache and gets the remaining part. Layer versions
+    change whenever the obstacle layer does, so routes over an outdated map are never
+    returned.
+    """
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (start, goal, mode, version) -> route tuple
+        self.along = OrderedDict()    # (goal, mode, version) -> (route tuple, {cell: offset})
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, start, goal, mode, version):
+        """Returns a fresh copy of the cached route, or None on a miss."""
+        key = (start, goal, mode, version)
+        route = self.entries.get(key)
+        if route is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return list(route)
+        latest = self.along.get(key[1:])
+        if latest is not None and start in latest[1]:
+            self.hits += 1
+            self.along.move_to_end(key[1:])
+            route, offsets = latest
+            return list(route[offsets[start]:])
+        self.misses += 1
+        return None
+
+    def put(self, start, goal, mode, version, route):
+        route = tuple(route)
+        self.entries[(start, goal, mode, version)] = route
+        self.along[(goal, mode, version)] = (route, {cell: offset for offset, cell in enumerate(route, start=1)})
+        for table in (self.entries, self.along):
+            while len(table) > self.max_entries:
+                table.popitem(last=False)
+
+    def invalidate(self, version=None):
+        """Drops the routes planned on the given map version, or every route."""
+        if version is None:
+            self.entries.clear()
+            self.along.clear()
+        else:
+            for table in (self.entries, self.along):
+                for key in [key for key in table if key[-1] == version]:
+                    del table[key]
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate,
+                "entries": len(self.entries)}
+
+PATH_CACHE = PathCache()
+
+def find_path(layers, start, goal, agent_mode=False, weighted=False):
+    """
+    a_star over layers["obstacles"] through PATH_CACHE. With weighted, routes are
+    planned on the hazard/sight cost_layer instead of unit step costs. Unweighted,
+    obstacle-aware queries on grids of HPA_MIN_CELLS or more go through the
+    hierarchical planner instead (near-optimal routes, see HierarchicalPlanner), with
+    a_star as the fallback when it finds none. The simulation's own callers all plan
+    weighted or in agent_mode, so this path is opt-in for unweighted obstacle-aware
+    callers on large maps. Returns a list the caller may consume (e.g. pop steps from).
+    """
+    versions = layers["versions"]
+    if weighted:
+        mode = (agent_mode, "weighted")
+        version = (versions["obstacles"], versions["hazards"], versions["sight"])
+    else:
+        mode, version = agent_mode, versions["obstacles"]
+    route = PATH_CACHE.get(start, goal, mode, version)
+    if route is None:
+        route = None
+        if not weighted and not agent_mode and layers["obstacles"].size >= HPA_MIN_CELLS:
+            route = hierarchical_planner(layers).find_path(start, goal) or None
+        if route is None:
+            route = a_star(layers["obstacles"], start, goal, agent_mode, cost_layer(layers) if weighted else None)
+        PATH_CACHE.put(start, goal, mode, version, route)
+    return route
+
+INF = float("inf")
+
+class IncrementalPlanner:
+    """
+    D* Lite planner toward a fixed goal that keeps its search state between calls.
+    The search runs backwards from the goal, so the walker can move freely; when the
+    obstacle, hazard or sight layers change, only the cells whose entry cost changed
+    are fed back into the search and just the affected part of it is repaired.
+    Entering a cell costs its cost_layer entry (weighted) or 1, obstacles are impassable
+    unless agent_mode, and the goal itself is always enterable.
+    """
+    def __init__(self, goal, agent_mode=False, weighted=True):
+        self.goal = goal
+        self.agent_mode = agent_mode
+        self.weighted = weighted
+        self.versions = None
+        self.width = self.height = None
+        self.target = self.start = self.last_start = None
+        self.entry_array = self.entry = None
+        self.km = 0
+        self.g = {}
+        self.rhs = {}
+        self.open_set = []
+        self.open_keys = {}  # cell -> key of its live heap entry
+        self.expanded = 0
+
+    def _entry_costs(self, layers):
+        obstacles = layers["obstacles"].ravel()
+        costs = np.array(cost_layer(layers)) if self.weighted else np.ones(obstacles.size)
+        if not self.agent_mode:
+            blocked = obstacles == 1
+            blocked[self.target] = False
+            costs[blocked] = INF
+        return costs
+
+    def _h(self, a, b):
+        return abs(a // self.height - b // self.height) + abs(a % self.height - b % self.height)
+
+    def _key(self, cell):
+        m = min(self.g.get(cell, INF), self.rhs.get(cell, INF))
+        return (m + self._h(self.start, cell) + self.km, m)
+
+    def _neighbors(self, cell):
+        x, y = divmod(cell, self.height)
+        if x > 0:
+            yield cell - self.height
+        if x < self.width - 1:
+            yield cell + self.height
+        if y > 0:
+            yield cell - 1
+        if y < self.height - 1:
+            yield cell + 1
+
+    def _update_vertex(self, cell):
+        if cell != self.target:
+            entry, g = self.entry, self.g
+            self.rhs[cell] = min((entry[n] + g.get(n, INF) for n in self._neighbors(cell)), default=INF)
+        self.open_keys.pop(cell, None)
+        if self.g.get(cell, INF) != self.rhs.get(cell, INF):
+            key = self._key(cell)
+            self.open_keys[cell] = key
+            heappush(self.open_set, (key, cell))
+
+    def _top(self):
+        while self.open_set:
+            key, cell = self.open_set[0]
+            if self.open_keys.get(cell) == key:
+                return key, cell
+            heappop(self.open_set)
+        return None
+
+    def _compute_shortest_path(self):
+        g, rhs = self.g, self.rhs
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            start_key = self._key(self.start)
+            if top[0] >= start_key and rhs.get(self.start, INF) == g.get(self.start, INF):
+                break
+            old_key, cell = top
+            new_key = self._key(cell)
+            if old_key < new_key:
+                self.open_keys[cell] = new_key
+                heappush(self.open_set, (new_key, cell))
+                continue
+            heappop(self.open_set)
+            del self.open_keys[cell]
+            self.expanded += 1
+            if g.get(cell, INF) > rhs.get(cell, INF):
+                g[cell] = rhs[cell]
+                for n in self._neighbors(cell):
+                    self._update_vertex(n)
+            else:
+                g[cell] = INF
+                self._update_vertex(cell)
+                for n in self._neighbors(cell):
+                    self._update_vertex(n)
+
+    def _reset(self, start, layers):
+        self.width, self.height = layers["obstacles"].shape
+        self.target = self.goal[0] * self.height + self.goal[1]
+        self.start = self.last_start = start[0] * self.height + start[1]
+        self.entry_array = self._entry_costs(layers)
+        self.entry = self.entry_array.tolist()
+        self.km = 0
+        self.g, self.rhs = {}, {self.target: 0}
+        key = (self._h(self.start, self.target), 0)
+        self.open_keys = {self.target: key}
+        self.open_set = [(key, self.target)]
+
+    def _apply_changes(self, layers):
+        entry_array = self._entry_costs(layers)
+        changed = np.nonzero(entry_array != self.entry_array)[0].tolist()
+        if not changed:
+            return
+        self.entry_array = entry_array
+        self.entry = entry_array.tolist()
+        self.km += self._h(self.last_start, self.start)
+        self.last_start = self.start
+        # A changed cell is cheaper or dearer to enter from each of its neighbours.
+        for cell in changed:
+            for n in self._neighbors(cell):
+                self._update_vertex(n)
+
+    def plan(self, start, layers):
+        """
+        Returns the cheapest route from start (excluded) to the goal (included) on the
+        current layers, or [] if the goal is unreachable.
+        """
+        versions = layers["versions"]
+        versions = (versions["obstacles"], versions["hazards"], versions["sight"])
+        if self.versions is None or layers["obstacles"].shape != (self.width, self.height):
+            self._reset(start, layers)
+        else:
+            self.start = start[0] * self.height + start[1]
+            if versions != self.versions:
+                self._apply_changes(layers)
+        self.versions = versions
+        self._compute_shortest_path()
+
+        route, cell, entry, g = [], self.start, self.entry, self.g
+        if g.get(cell, INF) == INF:
+            return []
+        while cell != self.target and len(route) < len(entry):
+            cell = min(self._neighbors(cell), key=lambda n: entry[n] + g.get(n, INF))
+            route.append(divmod(cell, self.height))
+        return route
+
+class DistanceField:
+    """
+    Multi-source breadth-first search over a grid. One O(grid) build stores, for every
+    cell, the step count to the nearest source, which source that is and the next cell
+    on the way, so "how far", "which one" and "where next" become O(1) lookups.
+    Obstacle cells are never expanded through, but still get a distance so a walker
+    standing on one can step out; agent_mode ignores obstacles like a_star does.
+    """
+    def __init__(self, grid, sources, agent_mode=False):
+        width, height = len(grid), len(grid[0])
+        blocked = bytes(width * height) if agent_mode else blocked_cells(grid)
+        self.width, self.height = width, height
+        self.dist = [-1] * (width * height)
+        self.next_hop = [-1] * (width * height)
+        self.origin = [-1] * (width * height)
+        queue = deque()
+        for x, y in sources:
+            i = x * height + y
+            if self.dist[i] == -1 and blocked[i] != 1:
+                self.dist[i] = 0
+                self.origin[i] = i
+                queue.append(i)
+        dist, next_hop, origin = self.dist, self.next_hop, self.origin
+        while queue:
+            i = queue.popleft()
+            x, y = divmod(i, height)
+            d = dist[i] + 1
+            for j, inside in ((i - height, x > 0), (i + height, x < width - 1),
+                              (i - 1, y > 0), (i + 1, y < height - 1)):
+                if inside and dist[j] == -1:
+                    dist[j] = d
+                    next_hop[j] = i
+                    origin[j] = origin[i]
+                    if blocked[j] != 1:
+                        queue.append(j)
+
+    def _cell(self, i):
+        return divmod(i, self.height)
+
+    def distance(self, pos):
+        """Steps from pos to the nearest source, or None if no source is reachable."""
+        d = self.dist[pos[0] * self.height + pos[1]]
+        return d if d >= 0 else None
+
+    def nearest_source(self, pos):
+        i = self.origin[pos[0] * self.height + pos[1]]
+        return self._cell(i) if i >= 0 else None
+
+    def next_step(self, pos):
+        """Next cell toward the nearest source, or None at a source or when unreachable."""
+        i = self.next_hop[pos[0] * self.height + pos[1]]
+        return self._cell(i) if i >= 0 else None
+
+    def route(self, pos):
+        """Full route from pos (excluded) to its nearest source, in a_star's format."""
+        route = []
+        i = self.next_hop[pos[0] * self.height + pos[1]]
+        while i >= 0:
+            route.append(self._cell(i))
+            i = self.next_hop[i]
+        return route
+
+_DERIVED = {}  # kind -> OrderedDict LRU of key -> structure
+DERIVED_CACHE_SIZE = 32
+
+def cached_by_version(kind, key, build, cache_size=DERIVED_CACHE_SIZE):
+    """
+    Returns the derived structure of the given kind for key (a tuple of layer versions
+    plus any parameters), calling build() only when it is not cached yet. Versions are
+    never reused, so entries never go stale; old ones are simply evicted. Each kind has
+    its own LRU of cache_size entries, so one kind cannot evict another.
+    """
+    cache = _DERIVED.setdefault(kind, OrderedDict())
+    value = cache.get(key)
+    if value is None:
+        value = cache[key] = build()
+        while len(cache) > cache_size:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return value
+
+def exit_field(layers):
+    """
+    Returns the DistanceField toward the safety cells of layers. Fields are cached by
+    obstacle and safety layer version, so they are only rebuilt when those change.
+    """
+    key = (layers["versions"]["obstacles"], layers["versions"]["safety"])
+    return cached_by_version("exit_field", key, lambda: DistanceField(
+        layers["obstacles"], np.argwhere(layers["safety"] == 1).tolist()))
+
+def cost_layer(layers, hazard_weight=HAZARD_COST_WEIGHT, sight_weight=SIGHT_COST_WEIGHT):
+    """
+    Flat per-cell entry costs for the planner: 1 per step plus hazard_weight per hazard
+    level plus sight_weight per 100% of sight obstruction. Every cost is at least 1, so
+    the Manhattan heuristic stays admissible. Computed once per hazard/sight version.
+    """
+    key = (layers["versions"]["hazards"], layers["versions"]["sight"], hazard_weight, sight_weight)
+    return cached_by_version("cost_layer", key, lambda: (
+        1 + hazard_weight * layers["hazards"].astype(np.float64)
+        + sight_weight * layers["sight"] / 100.0).ravel().tolist())
+
 def drl_next_step(env, obs):
     if DRL_MODEL:
         action, _ = DRL_MODEL.predict(obs, deterministic=True)
@@ -0,0 +1,58 @@
+import time
+import numpy as np
+
+_KERNELS = {}
+
+def falloff_kernel(radius, full_range, falloff=5):
+    """
+    Base confidence (%) over a (2 * radius + 1)^2 window centred on the observer:
+    100 within Manhattan distance full_range, then falloff points less per extra cell
+    (negative values are clipped once obstruction is applied). Cached per argument set.
+    """
+    key = (radius, full_range, falloff)
+    kernel = _KERNELS.get(key)
+    if kernel is None:
+        span = np.abs(np.arange(-radius, radius + 1))
+        distance = span[:, None] + span[None, :]
+        kernel = _KERNELS[key] = np.where(distance <= full_range, 100, 100 - falloff * (distance - full_range))
+        kernel.setflags(write=False)
+    return kernel
+
+class SensorReport:
+    """
+    What one observer saw in one tick: the window's origin (its lowest x, y cell), copies
+    of the hazard/obstacle/safety slices under it, one timestamp and a confidence per
+    cell. Consumers apply it to grid-sized layers with report.window slices.
+    """
+    def __init__(self, origin, hazards, obstacles, safety, confidence, timestamp):
+        self.origin = origin
+        self.hazards = hazards
+        self.obstacles = obstacles
+        self.safety = safety
+        self.confidence = confidence
+        self.timestamp = timestamp
+
+    @property
+    def window(self):
+        x0, y0 = self.origin
+        width, height = self.confidence.shape
+        return (slice(x0, x0 + width), slice(y0, y0 + height))
+
+    def __len__(self):
+        return self.confidence.size
+
+    @classmethod
+    def capture(cls, true_map, x, y, radius, full_range, falloff=5):
+        """
+        Reads the window within Chebyshev distance radius of (x, y), clipped to the map.
+        Confidence is the falloff kernel times (1 - sight obstruction of the cell).
+        """
+        width, height = true_map["sight"].shape
+        x0, x1 = max(0, x - radius), min(width, x + radius + 1)
+        y0, y1 = max(0, y - radius), min(height, y + radius + 1)
+        window = (slice(x0, x1), slice(y0, y1))
+        kernel = falloff_kernel(radius, full_range, falloff)
+        base = kernel[x0 - x + radius:x1 - x + radius, y0 - y + radius:y1 - y + radius]
+        obstruction = true_map["sight"][window] / 100.0
+        return cls((x0, y0), true_map["hazards"][window].copy(), true_map["obstacles"][window].copy(),
+                   true_map["safety"][window].copy(), np.maximum(0, base * (1 - obstruction)), time.time())
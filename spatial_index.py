@@ -0,0 +1,124 @@
+from heapq import heappop, heappush
+from itertools import islice
+from config import SPATIAL_BUCKET_SIZE
+
+class SpatialIndex:
+    """
+    Uniform-grid (bucket) index of entities with x/y cell coordinates, e.g. victims or
+    agents. Entities that stop being live (rescued, dead) drop out on refresh().
+    Queries visit only the buckets that can hold an answer; ties are broken by the
+    entity's position in the list the index was built from, like a list scan would.
+    """
+    def __init__(self, items, live=None, bucket_size=SPATIAL_BUCKET_SIZE):
+        self.bucket_size = bucket_size
+        self.live = live
+        self.buckets = {}   # (bucket x, bucket y) -> {order: item}
+        self.entries = {}   # id(item) -> (order, item, (x, y))
+        for order, item in enumerate(items):
+            if live is None or live(item):
+                self._insert(order, item)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _bucket(self, x, y):
+        return (x // self.bucket_size, y // self.bucket_size)
+
+    def _insert(self, order, item):
+        position = (item.x, item.y)
+        self.entries[id(item)] = (order, item, position)
+        self.buckets.setdefault(self._bucket(*position), {})[order] = item
+
+    def remove(self, item):
+        entry = self.entries.pop(id(item), None)
+        if entry is not None:
+            order, _, position = entry
+            bucket = self._bucket(*position)
+            del self.buckets[bucket][order]
+            if not self.buckets[bucket]:
+                del self.buckets[bucket]
+
+    def update(self, item):
+        """
+        Re-buckets item after it moved (or drops it once it is no longer live).
+        """
+        entry = self.entries.get(id(item))
+        if entry is None:
+            return
+        if self.live is not None and not self.live(item):
+            self.remove(item)
+        elif entry[2] != (item.x, item.y):
+            self.remove(item)
+            self._insert(entry[0], item)
+
+    def refresh(self):
+        """
+        Brings every entry in line with its entity's current position and liveness.
+        """
+        for _, item, _ in list(self.entries.values()):
+            self.update(item)
+
+    def nearest(self, x, y, k=None, radius=None, where=None):
+        """
+        Entities in order of Manhattan distance from (x, y), at most k of them and none
+        farther than radius. where filters entities. Buckets are visited in rings of
+        growing Chebyshev distance and an entity is handed out as soon as no unvisited
+        ring can hold a closer one, so callers that stop early pay only for what they use.
+        """
+        results = self._nearest(x, y, radius, where)
+        return list(islice(results, k)) if k is not None else results
+
+    def _nearest(self, x, y, radius, where):
+        size = self.bucket_size
+        bx, by = self._bucket(x, y)
+        if self.buckets:
+            xs = [b[0] for b in self.buckets]
+            ys = [b[1] for b in self.buckets]
+            max_ring = max(bx - min(xs), max(xs) - bx, by - min(ys), max(ys) - by)
+        else:
+            max_ring = -1
+        found = []
+        for ring in range(max_ring + 2):
+            # Every cell in ring `ring` or beyond is at least this far from (x, y).
+            bound = (ring - 1) * size + 1 if ring > 0 else 0
+            if radius is not None and bound > radius:
+                break
+            while found and found[0][0] < bound:
+                yield heappop(found)[2]
+            if ring > max_ring:
+                continue
+            for bucket in self._ring(bx, by, ring):
+                for order, item in self.buckets.get(bucket, {}).items():
+                    ix, iy = self.entries[id(item)][2]
+                    distance = abs(ix - x) + abs(iy - y)
+                    if (radius is None or distance <= radius) and (where is None or where(item)):
+                        heappush(found, (distance, order, item))
+        while found:
+            yield heappop(found)[2]
+
+    @staticmethod
+    def _ring(bx, by, ring):
+        if ring == 0:
+            yield (bx, by)
+            return
+        for i in range(-ring, ring + 1):
+            yield (bx + i, by - ring)
+            yield (bx + i, by + ring)
+        for j in range(-ring + 1, ring):
+            yield (bx - ring, by + j)
+            yield (bx + ring, by + j)
+
+    def in_rect(self, x0, y0, x1, y1, where=None):
+        """
+        Entities inside the inclusive cell rectangle (x0, y0)-(x1, y1), in list order.
+        """
+        (bx0, by0), (bx1, by1) = self._bucket(x0, y0), self._bucket(x1, y1)
+        hits = []
+        for bucket_x in range(bx0, bx1 + 1):
+            for bucket_y in range(by0, by1 + 1):
+                for order, item in self.buckets.get((bucket_x, bucket_y), {}).items():
+                    ix, iy = self.entries[id(item)][2]
+                    if x0 <= ix <= x1 and y0 <= iy <= y1 and (where is None or where(item)):
+                        hits.append((order, item))
+        hits.sort(key=lambda hit: hit[0])
+        return [item for _, item in hits]
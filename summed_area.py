@@ -0,0 +1,51 @@
+import numpy as np
+from pathfinding import cached_by_version
+
+# What each kind of table counts: the layer it reads and the cell test.
+COUNTED_CELLS = {
+    "free": ("obstacles", lambda layer: layer != 1),
+    "safety": ("safety", lambda layer: layer == 1),
+    "hazard": ("hazards", lambda layer: layer > 0),
+}
+
+class SummedAreaTable:
+    """
+    Summed-area table (integral image) of a boolean grid: after one O(grid) build, the
+    number of set cells in any rectangle takes four lookups.
+    """
+    def __init__(self, mask):
+        width, height = mask.shape
+        self.shape = mask.shape
+        self.table = np.zeros((width + 1, height + 1), dtype=np.int64)
+        np.cumsum(np.cumsum(mask, axis=0), axis=1, out=self.table[1:, 1:])
+
+    def count(self, x0, y0, x1, y1):
+        """
+        Set cells in the inclusive rectangle (x0, y0)-(x1, y1), clipped to the grid.
+        """
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, self.shape[0] - 1), min(y1, self.shape[1] - 1)
+        if x0 > x1 or y0 > y1:
+            return 0
+        table = self.table
+        return int(table[x1 + 1, y1 + 1] - table[x0, y1 + 1] - table[x1 + 1, y0] + table[x0, y0])
+
+    def counts(self, x0, y0, x1, y1):
+        """
+        count for arrays of rectangles at once.
+        """
+        width, height = self.shape
+        x0, y0 = np.clip(x0, 0, width), np.clip(y0, 0, height)
+        x1, y1 = np.clip(np.asarray(x1) + 1, x0, width), np.clip(np.asarray(y1) + 1, y0, height)
+        table = self.table
+        return table[x1, y1] - table[x0, y1] - table[x1, y0] + table[x0, y0]
+
+def region_counts(layers, kind):
+    """
+    Returns the SummedAreaTable of the given kind ("free", "safety" or "hazard") for
+    layers. Tables are cached by the version of the layer they read, so each one is
+    rebuilt only after that layer changed.
+    """
+    name, test = COUNTED_CELLS[kind]
+    return cached_by_version("summed_area", (layers["versions"][name], kind),
+                             lambda: SummedAreaTable(test(layers[name])))
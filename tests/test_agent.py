@@ -0,0 +1,57 @@
+import random
+import numpy as np
+from agent import VictimPopulation
+from map import create_map, evolve_situation
+
+def reference_step(victims, layers, rng):
+    """
+    The per-victim loop main.py ran before VictimPopulation.step, drawing the random
+    step from rng the way step does (one draw per victim that did not move).
+    """
+    width, height = layers["obstacles"].shape
+    for victim in victims:
+        if victim.rescued:
+            continue
+        if victim.remaining_life <= 0:
+            victim.rescued = True
+            continue
+        previous = (victim.x, victim.y)
+        victim.self_rescue(layers)
+        if (victim.x, victim.y) == previous:
+            moves = [(victim.x + dx, victim.y + dy) for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                     if 0 <= victim.x + dx < width and 0 <= victim.y + dy < height
+                     and layers["obstacles"][victim.x + dx][victim.y + dy] != 1]
+            pick = int(rng.random() * len(moves))
+            if moves:
+                victim.x, victim.y = moves[pick]
+                victim.apply_hazard_damage(layers)
+        if layers["safety"][victim.x][victim.y] == 1:
+            victim.rescued = True
+            if victim.rescued_by is None:
+                victim.rescued_by = "self"
+
+def test_population_step_matches_per_victim_loop():
+    random.seed(16)
+    rng = np.random.default_rng(16)
+    layers = create_map()
+    # More hazards than a fresh map, so victims flee, take damage and die.
+    for _ in range(40):
+        evolve_situation(layers, rng)
+    width, height = layers["obstacles"].shape
+    positions = np.stack((rng.integers(0, width, 300), rng.integers(0, height, 300)), axis=1)
+    # Half of them near the safety border, where they head for safety.
+    positions[::2, 1] = rng.choice([1, 2, 3, 4, height - 5, height - 4, height - 3, height - 2], 150)
+    population = VictimPopulation(positions, rng=np.random.default_rng(7))
+    reference = VictimPopulation(positions)
+    reference_rng = np.random.default_rng(7)
+    for victims in (population, reference):
+        victims.life[::7] = 0
+        victims.life[1::5] = 15
+        victims.being_guided[2::11] = True
+    for _ in range(30):
+        population.step(layers)
+        reference_step(reference, layers, reference_rng)
+        for name in ("x", "y", "life", "rescued", "being_guided", "rescued_by"):
+            assert (getattr(population, name) == getattr(reference, name)).all(), name
+        evolve_situation(layers, rng)
+    assert population.rescued.any() and (population.life == 0).sum() > len(positions) // 7
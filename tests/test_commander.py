@@ -0,0 +1,171 @@
+import itertools
+import random
+from itertools import permutations
+from types import SimpleNamespace
+import numpy as np
+from map import create_map, new_version, patch_sight_layer, touch_layers
+from commander import COMMANDER_CANDIDATES, Commander, danger_field, min_cost_assignment, DANGER_FFT_MIN_RADIUS, TASK_REGION_MARGIN
+
+def reference_danger_level(hazards, x, y, radius):
+    """
+    The per-victim loop compute_danger_level used before danger_field.
+    """
+    width, height = hazards.shape
+    total = 0
+    for i in range(max(0, x - radius), min(width, x + radius + 1)):
+        for j in range(max(0, y - radius), min(height, y + radius + 1)):
+            if hazards[i][j] > 0:
+                d = abs(x - i) + abs(y - j)
+                if d == 0:
+                    d = 1
+                total += hazards[i][j] / d
+    return total
+
+def test_danger_field_matches_per_victim_loop():
+    rng = np.random.default_rng(22)
+    hazards = rng.choice(4, size=(60, 45), p=[0.85, 0.05, 0.05, 0.05]).astype(np.uint8)
+    hazards[20:40, :] = 0  # a hazard-free band, where the FFT result must be exactly 0
+    layers = {"hazards": hazards, "versions": {"hazards": new_version()}}
+    cells = [(0, 0), (59, 44), (0, 44), (59, 0), (30, 22)]
+    cells += list(zip(rng.integers(0, 60, 60).tolist(), rng.integers(0, 45, 60).tolist()))
+    # Radii on both sides of the direct/FFT threshold, and ones past the map size.
+    for radius in sorted({0, 1, DANGER_FFT_MIN_RADIUS - 1, DANGER_FFT_MIN_RADIUS, 5, 10, 25, 70}):
+        field = danger_field(layers, radius)
+        assert field.shape == hazards.shape
+        for x, y in cells:
+            expected = reference_danger_level(hazards, x, y, radius)
+            assert abs(field[x, y] - expected) < 1e-9
+            if expected == 0:
+                assert field[x, y] == 0
+
+def brute_force_assignment_cost(cost):
+    rows, columns = cost.shape
+    if rows > columns:
+        return brute_force_assignment_cost(cost.T)
+    return min(sum(cost[row, column] for row, column in enumerate(chosen))
+               for chosen in permutations(range(columns), rows))
+
+def test_min_cost_assignment_matches_brute_force():
+    rng = np.random.default_rng(21)
+    matrices = [np.zeros((3, 3)), np.zeros((2, 5)), np.full((4, 4), 7.0), np.full((5, 3), 2.5)]
+    for _ in range(60):
+        rows, columns = rng.integers(1, 7, size=2)
+        # Small integer costs give plenty of ties.
+        matrices.append(rng.integers(0, 5, size=(rows, columns)).astype(float))
+        matrices.append(rng.random((rows, columns)) * 100)
+    for cost in matrices:
+        pairs = min_cost_assignment(cost)
+        assert len(pairs) == min(cost.shape)
+        assert pairs == sorted(pairs)
+        assert len({row for row, _ in pairs}) == len({column for _, column in pairs}) == len(pairs)
+        total = sum(cost[row, column] for row, column in pairs)
+        assert abs(total - brute_force_assignment_cost(cost)) < 1e-9
+
+def entity(x, y):
+    return SimpleNamespace(x=x, y=y, remaining_life=100, rescued=False)
+
+def set_hazards(layers, cells, levels):
+    """
+    Writes hazard levels like the Communicator does and returns the take_changes record.
+    """
+    cells = np.array(cells, dtype=np.int64).reshape(-1, 2)
+    layers["hazards"][cells[:, 0], cells[:, 1]] = levels
+    sight = patch_sight_layer(layers["sight"], layers["hazards"], cells)
+    touch_layers(layers, "hazards", "sight")
+    return {"hazards": cells, "sight": sight}
+
+def far_cell(layers, paths, rng):
+    """A random cell whose sight footprint stays clear of every planned path."""
+    width, height = layers["hazards"].shape
+    cells = np.concatenate([np.array(path).reshape(-1, 2) for path in paths])
+    while True:
+        x, y = int(rng.integers(width)), int(rng.integers(height))
+        if np.abs(cells - (x, y)).max(axis=1).min() > TASK_REGION_MARGIN + 3:
+            return (x, y)
+
+def assert_same_task(task, expected):
+    assert (task is None) == (expected is None)
+    if task is not None:
+        assert task["agent"] is expected["agent"] and task["victim"] is expected["victim"]
+        assert task["score"] == expected["score"]
+
+def test_task_table_matches_select_task_from_scratch():
+    random.seed(24)
+    rng = np.random.default_rng(24)
+    layers = create_map()
+    width, height = layers["obstacles"].shape
+    agents = [entity(int(rng.integers(1, width - 1)), int(rng.integers(1, height - 1))) for _ in range(4)]
+    victims = [entity(int(rng.integers(1, width - 1)), int(rng.integers(1, height - 1))) for _ in range(30)]
+    commander = Commander()
+    changes = None
+    for round_number in range(40):
+        task = commander.select_task(agents, victims, [], layers, changes=changes)
+        assert_same_task(task, Commander().select_task(agents, victims, [], layers))
+        if task is None:
+            break
+        paths = [entry.path for entry in commander.task_table.values() if entry.path_to_victim]
+        if round_number % 3 == 0:
+            # Near: a hazard right on the chosen path.
+            cell = task["path"][len(task["path"]) // 2]
+            changes = set_hazards(layers, [cell], (layers["hazards"][cell] + 1) % 4)
+        elif round_number % 3 == 1:
+            # Far: a hazard away from every cached path, which must not cost any re-plan.
+            evaluations = commander.evaluations
+            changes = set_hazards(layers, [far_cell(layers, paths, rng)], int(rng.integers(1, 4)))
+            assert_same_task(commander.select_task(agents, victims, [], layers, changes=changes),
+                             Commander().select_task(agents, victims, [], layers))
+            assert commander.evaluations == evaluations
+            changes = {}
+        else:
+            # The chosen agent walks along its path; the rest of it is kept.
+            step = task["path"][0]
+            task["agent"].x, task["agent"].y = step
+            changes = {}
+    assert commander.reused > commander.evaluations
+
+def assert_valid_task(task, layers):
+    agent, victim = task["agent"], task["victim"]
+    assert agent.remaining_life > 0 and not victim.rescued and victim.remaining_life > 0
+    assert task["target"] == (victim.x, victim.y) and task["target"] in task["path"]
+    previous = (agent.x, agent.y)
+    for cell in task["path"]:
+        assert abs(cell[0] - previous[0]) + abs(cell[1] - previous[1]) == 1
+        previous = cell
+    assert layers["safety"][previous] == 1
+    assert task["score"] == Commander().evaluate_path(task["path"], victim, agent, layers)
+
+def test_plan_budget_keeps_tasks_valid(monkeypatch):
+    # A clock that ticks once per reading, so a budget of n lets n + 1 pairs be planned.
+    clock = itertools.count()
+    monkeypatch.setattr("commander.time", SimpleNamespace(perf_counter=lambda: float(next(clock))))
+    candidates = 3 * COMMANDER_CANDIDATES
+    for budget in (0, 1, candidates + 5):
+        random.seed(25)
+        rng = np.random.default_rng(25)
+        layers = create_map()
+        width, height = layers["obstacles"].shape
+        agents = [entity(int(rng.integers(1, width - 1)), int(rng.integers(1, height - 1))) for _ in range(3)]
+        victims = [entity(int(rng.integers(1, width - 1)), int(rng.integers(1, height - 1))) for _ in range(20)]
+        for agent in agents:
+            agent.current_task = None
+        budgeted, unlimited = Commander(plan_budget=budget), Commander()
+        changes = None
+        for _ in range(25):
+            evaluations = budgeted.evaluations
+            tasks = budgeted.select_tasks(agents, victims, [], layers, changes=changes)
+            expected = unlimited.select_tasks(agents, victims, [], layers, changes=changes)
+            assert budgeted.evaluations - evaluations <= budget + 1
+            # Selection never stalls while there is something to pick.
+            assert len(tasks) == len(expected) == 1
+            if budget > candidates:
+                assert_same_task(tasks[0], expected[0])
+            task = tasks[0]
+            assert_valid_task(task, layers)
+            previous = {id(agent): agent.current_task for agent in agents}
+            task["agent"].current_task = task
+            for agent in agents:
+                assert agent.current_task in (task, previous[id(agent)])
+            task["agent"].x, task["agent"].y = task["path"][0]
+            cells = rng.integers(0, (width, height), size=(3, 2))
+            changes = set_hazards(layers, cells, rng.integers(0, 4, size=3))
+        assert (budgeted.budget_hits > 0) == (budget < candidates)
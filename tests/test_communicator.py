@@ -0,0 +1,84 @@
+import random
+import numpy as np
+import pytest
+from communicator import Communicator
+from map import create_map
+from sensor_report import SensorReport
+
+def random_report(communicator, rng, timestamp):
+    """A report over a random window with random hazards and confidences."""
+    perceived = communicator.perceived_map
+    width, height = perceived["hazards"].shape
+    x0, y0 = int(rng.integers(width - 3)), int(rng.integers(height - 3))
+    x1, y1 = min(width, x0 + int(rng.integers(3, 12))), min(height, y0 + int(rng.integers(3, 12)))
+    window = (slice(x0, x1), slice(y0, y1))
+    shape = (x1 - x0, y1 - y0)
+    obstacles = perceived["obstacles"][window].copy()
+    obstacles[rng.random(shape) < 0.05] ^= 1
+    return SensorReport((x0, y0), rng.integers(0, 4, size=shape).astype(np.uint8), obstacles,
+                        perceived["safety"][window].copy(),
+                        (rng.random(shape) * 100).astype(np.float32), timestamp)
+
+def test_lazy_confidence_decay_matches_eager_decay():
+    random.seed(19)
+    rng = np.random.default_rng(19)
+    communicator = Communicator(create_map(), decay_rate=0.5)
+    # The eager reference decays every cell at every tick and fuses against that.
+    eager = np.zeros(communicator.perceived_map["hazards"].shape)
+    hazards = communicator.perceived_map["hazards"].copy()
+    now = 1000.0
+    for _ in range(60):
+        elapsed = float(rng.uniform(0.1, 20))
+        now += elapsed
+        eager = np.maximum(0, eager - communicator.decay_rate * elapsed)
+        report = random_report(communicator, rng, now)
+        accept = report.confidence >= eager[report.window]
+        eager[report.window][accept] = report.confidence[accept]
+        hazards[report.window][accept] = report.hazards[accept]
+        communicator.update_from_report(report)
+        later = now + float(rng.uniform(0, 5))
+        expected = np.maximum(0, eager - communicator.decay_rate * (later - now))
+        assert np.allclose(communicator.confidence_field(later), expected, atol=1e-6)
+        x, y = int(rng.integers(expected.shape[0])), int(rng.integers(expected.shape[1]))
+        assert communicator.confidence_at(x, y, later) == pytest.approx(expected[x, y], abs=1e-6)
+        assert (communicator.perceived_map["hazards"] == hazards).all()
+
+def test_take_changes_records_and_empties():
+    random.seed(20)
+    rng = np.random.default_rng(20)
+    communicator = Communicator(create_map())
+    perceived = communicator.perceived_map
+    assert communicator.take_changes() == {}
+    before = {name: perceived[name].copy() for name in ("hazards", "obstacles", "sight")}
+    versions = dict(perceived["versions"])
+    for tick in range(5):
+        communicator.update_from_report(random_report(communicator, rng, 1000.0 + tick))
+    changes = communicator.take_changes()
+    for name, layer in before.items():
+        moved = np.argwhere(perceived[name] != layer)
+        assert (perceived["versions"][name] != versions[name]) == (name in changes)
+        if name in changes:
+            assert (changes[name] == moved).all() and changes[name].shape == moved.shape
+    assert "hazards" in changes
+    assert communicator.take_changes() == {}
+
+def test_snapshot_is_unchanged_by_later_writes():
+    random.seed(20)
+    rng = np.random.default_rng(20)
+    communicator = Communicator(create_map())
+    snapshot = communicator.snapshot()
+    assert communicator.snapshot() is snapshot
+    copies = {name: np.array(snapshot[name]) for name in snapshot if name != "versions"}
+    versions = dict(snapshot["versions"])
+    for tick in range(5):
+        communicator.update_from_report(random_report(communicator, rng, 1000.0 + tick))
+    communicator.update_perceived_map()
+    assert communicator.take_changes()
+    for name, copy in copies.items():
+        assert np.array_equal(snapshot[name], copy, equal_nan=True)
+    assert dict(snapshot["versions"]) == versions
+    with pytest.raises(ValueError):
+        snapshot["hazards"][0, 0] = 1
+    latest = communicator.snapshot()
+    assert latest is not snapshot and latest.version > snapshot.version
+    assert not np.array_equal(latest["hazards"], snapshot["hazards"])
@@ -0,0 +1,128 @@
+import random
+import numpy as np
+from config import SPREAD_OPPORTUNITY
+from map import evolve_situation, update_sight_layer, patch_sight_layer
+
+def reference_evolve(hazards, rand):
+    """
+    The per-cell evolve_situation loop evolve_situation replaced, on any grid shape.
+    """
+    width, height = hazards.shape
+    new_hazards = [list(column) for column in hazards.tolist()]
+    updated = [[False] * height for _ in range(width)]
+    for x in range(width):
+        for y in range(height):
+            level = hazards[x][y]
+            if level > 0:
+                for dx in [-1, 0, 1]:
+                    for dy in [-1, 0, 1]:
+                        if dx == 0 and dy == 0:
+                            continue
+                        nx, ny = x + dx, y + dy
+                        if 0 <= nx < width and 0 <= ny < height:
+                            base_multiplier = {3: 1.0, 2: 0.5, 1: 0.1}[level]
+                            if dx == 1 and dy == 1:
+                                effective_chance = base_multiplier * SPREAD_OPPORTUNITY
+                            else:
+                                effective_chance = base_multiplier * SPREAD_OPPORTUNITY * 0.3
+                            if rand.random() < effective_chance:
+                                if new_hazards[nx][ny] < level:
+                                    new_hazards[nx][ny] = level
+                                    updated[nx][ny] = True
+    for x in range(width):
+        for y in range(height):
+            if updated[x][y]:
+                continue
+            level = new_hazards[x][y]
+            if level > 0:
+                new_level = level
+                if rand.random() < 0.10 and level < 3:
+                    new_level = level + 1
+                    updated[x][y] = True
+                if rand.random() < 0.05 and new_level > 0:
+                    new_level = new_level - 1
+                    updated[x][y] = True
+                new_hazards[x][y] = new_level
+    return np.array(new_hazards)
+
+def small_hazard_map():
+    hazards = np.zeros((12, 10), dtype=np.uint8)
+    hazards[2, 2] = 3
+    hazards[3, 2] = 1
+    hazards[6, 5] = 2
+    hazards[9, 8] = 1
+    hazards[11, 0] = 3  # on the map edge
+    return hazards
+
+def layers_for(hazards):
+    return {"hazards": hazards.copy(), "sight": update_sight_layer(hazards), "versions": {"hazards": 0, "sight": 0}}
+
+def level_frequencies(step, trials):
+    """
+    Fraction of trials in which each cell ends a single step at each level, (W, H, 4),
+    and the total hazard level of the map after each trial.
+    """
+    counts = np.zeros(small_hazard_map().shape + (4,))
+    totals = np.zeros(trials)
+    for trial in range(trials):
+        result = step(trial)
+        for level in range(4):
+            counts[..., level] += result == level
+        totals[trial] = result.sum()
+    return counts / trials, totals
+
+def test_evolve_situation_matches_reference_loop_statistically():
+    trials = 4000
+    reference, reference_totals = level_frequencies(lambda trial: reference_evolve(small_hazard_map(), random.Random(trial)), trials)
+    rng = np.random.default_rng(12345)
+
+    def vectorized(trial):
+        layers = layers_for(small_hazard_map())
+        evolve_situation(layers, rng)
+        return layers["hazards"]
+    batched, batched_totals = level_frequencies(vectorized, trials)
+    # Per cell and level, the two frequencies are independent estimates of the same
+    # probability. Their standardized squared differences sum to roughly a chi-square
+    # variable with one degree of freedom per bin: allow five standard deviations.
+    p = (reference + batched) / 2
+    varying = (p > 0) & (p < 1)
+    variance = 2 * p[varying] * (1 - p[varying]) / trials
+    statistic = ((reference - batched)[varying] ** 2 / variance).sum()
+    bins = varying.sum()
+    assert statistic < bins + 5 * np.sqrt(2 * bins)
+    # Escalation, decay and spread all move the total level: compare its mean the same way.
+    error = np.sqrt((reference_totals.var() + batched_totals.var()) / trials)
+    assert abs(reference_totals.mean() - batched_totals.mean()) < 5 * error
+    # The rules leave a trace: the favoured (1, 1) diagonal catches more spread.
+    assert batched[3, 3, 3] > 2 * batched[1, 1, 3]
+
+def test_evolve_situation_reports_changed_cells():
+    layers = layers_for(small_hazard_map())
+    before = layers["hazards"].copy()
+    changed = evolve_situation(layers, np.random.default_rng(7))
+    assert sorted(map(tuple, changed.tolist())) == sorted(map(tuple, np.argwhere(before != layers["hazards"]).tolist()))
+
+def test_patch_sight_layer_matches_full_rebuild():
+    rng = np.random.default_rng(3)
+    hazards = rng.choice(4, size=(200, 150), p=[0.9, 0.04, 0.03, 0.03]).astype(np.uint8)
+    sight = update_sight_layer(hazards)
+    # From a single cell up to enough cells to take the full-rebuild branch; half of the
+    # cells are burning ones, so lowered hazards are covered as well as raised ones.
+    for count in (1, 2, 10, 50, 150, 400):
+        before = sight.copy()
+        burning = np.argwhere(hazards > 0)
+        cells = np.concatenate([burning[rng.choice(len(burning), count - count // 2, replace=False)],
+                                np.stack([rng.integers(0, 200, count // 2), rng.integers(0, 150, count // 2)], axis=1)])
+        hazards[cells[:, 0], cells[:, 1]] = rng.integers(0, 4, count)
+        moved = patch_sight_layer(sight, hazards, cells)
+        assert (sight == update_sight_layer(hazards)).all()
+        assert sorted(map(tuple, moved.tolist())) == sorted(map(tuple, np.argwhere(before != sight).tolist()))
+
+def test_patch_sight_layer_on_map_edges():
+    hazards = np.zeros((5, 4), dtype=np.uint8)
+    sight = update_sight_layer(hazards)
+    corners = np.array([(0, 0), (4, 3), (0, 3), (4, 0)])
+    for level in (3, 1, 0):
+        hazards[corners[:, 0], corners[:, 1]] = level
+        patch_sight_layer(sight, hazards, corners)
+        assert (sight == update_sight_layer(hazards)).all()
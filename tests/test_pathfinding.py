@@ -0,0 +1,84 @@
+import random
+import numpy as np
+from hierarchical_pathfinding import HierarchicalPlanner
+from map import new_version, touch_layers
+from pathfinding import a_star, jump_point_search, cost_layer, IncrementalPlanner
+
+def assert_valid_route(grid, start, goal, route, agent_mode):
+    previous = start
+    for cell in route:
+        assert abs(cell[0] - previous[0]) + abs(cell[1] - previous[1]) == 1
+        assert agent_mode or grid[cell] != 1
+        previous = cell
+    assert not route or route[-1] == goal
+
+def test_jump_point_search_matches_a_star_lengths():
+    rng = np.random.default_rng(13)
+    rand = random.Random(13)
+    # Degenerate single-row and single-column grids included.
+    for width, height, density in ((30, 20, 0.05), (30, 20, 0.3), (12, 1, 0.1), (1, 12, 0.1), (2, 1, 0.0)):
+        for _ in range(40):
+            grid = (rng.random((width, height)) < density).astype(np.uint8)
+            start = (rand.randrange(width), rand.randrange(height))
+            goal = (rand.randrange(width), rand.randrange(height))
+            for agent_mode in (False, True):
+                expected = a_star(grid, start, goal, agent_mode, [1] * grid.size)
+                route = jump_point_search(grid, start, goal, agent_mode)
+                assert len(route) == len(expected)
+                assert_valid_route(grid, start, goal, route, agent_mode)
+
+def test_hierarchical_planner_matches_a_star_reachability():
+    rng = np.random.default_rng(12)
+    rand = random.Random(12)
+    for width, height, cluster_size, density in ((54, 71, 4, 0.3), (40, 25, 3, 0.2), (33, 47, 8, 0.35)):
+        for _ in range(8):
+            grid = (rng.random((width, height)) < density).astype(np.uint8)
+            planner = HierarchicalPlanner(grid, cluster_size)
+            # Blocked starts on a cluster border can only leave through a neighbouring cluster.
+            border = [tuple(cell) for cell in np.argwhere(grid == 1).tolist()
+                      if {cell[0] % cluster_size, cell[1] % cluster_size} & {0, cluster_size - 1}]
+            for query in range(30):
+                start = rand.choice(border) if query % 2 else (rand.randrange(width), rand.randrange(height))
+                goal = (rand.randrange(width), rand.randrange(height))
+                expected = a_star(grid, start, goal)
+                route = planner.find_path(start, goal)
+                assert bool(route) == bool(expected), (start, goal)
+                assert_valid_route(grid, start, goal, route, False)
+                assert len(route) >= len(expected)
+                if len(expected) >= 4 * cluster_size:
+                    assert len(route) <= 1.5 * len(expected)
+
+def route_cost(layers, route):
+    costs = cost_layer(layers)
+    height = layers["obstacles"].shape[1]
+    return sum(costs[x * height + y] for x, y in route)
+
+def test_incremental_planner_matches_weighted_a_star_after_changes():
+    rng = np.random.default_rng(11)
+    width, height = 30, 20
+    for agent_mode in (False, True):
+        layers = {"obstacles": (rng.random((width, height)) < 0.2).astype(np.uint8),
+                  "hazards": rng.choice(4, size=(width, height), p=[0.8, 0.1, 0.05, 0.05]).astype(np.uint8),
+                  "sight": rng.integers(0, 101, size=(width, height)).astype(np.float32),
+                  "versions": {name: new_version() for name in ("obstacles", "hazards", "sight")}}
+        goal = (width - 2, height - 3)
+        layers["obstacles"][goal] = 0
+        planner = IncrementalPlanner(goal, agent_mode=agent_mode, weighted=True)
+        position = (1, 2)
+        for _ in range(12):
+            route = planner.plan(position, layers)
+            expected = a_star(layers["obstacles"], position, goal, agent_mode, cost_layer(layers))
+            assert bool(route) == bool(expected)
+            assert_valid_route(layers["obstacles"], position, goal, route, agent_mode)
+            assert abs(route_cost(layers, route) - route_cost(layers, expected)) < 1e-6
+            if route:
+                position = route[min(2, len(route) - 1)]
+            # Obstacles and hazards change between calls, some of them on the planned route.
+            cells = [tuple(cell) for cell in rng.integers(0, (width, height), size=(8, 2)).tolist()]
+            cells += route[3:6]
+            for cell in cells[::2]:
+                if cell not in (goal, position):
+                    layers["obstacles"][cell] ^= 1
+            for cell in cells[1::2]:
+                layers["hazards"][cell] = rng.integers(0, 4)
+            touch_layers(layers, "obstacles", "hazards")
@@ -0,0 +1,31 @@
+from types import SimpleNamespace
+import numpy as np
+from spatial_index import SpatialIndex
+
+def brute_force_nearest(items, x, y, k=None, radius=None, where=None):
+    ranked = sorted((abs(item.x - x) + abs(item.y - y), order, item) for order, item in enumerate(items)
+                    if (radius is None or abs(item.x - x) + abs(item.y - y) <= radius)
+                    and (where is None or where(item)))
+    return [item for _, _, item in ranked][:k]
+
+def test_nearest_matches_brute_force_sort():
+    rng = np.random.default_rng(15)
+    # Clustered positions give plenty of distance ties, broken by list order.
+    items = [SimpleNamespace(x=int(x), y=int(y), live=True)
+             for x, y in rng.integers(0, 20, size=(150, 2)).tolist() + rng.integers(0, 75, size=(150, 2)).tolist()]
+    index = SpatialIndex(items, live=lambda item: item.live, bucket_size=8)
+    for round_number in range(3):
+        live = [item for item in items if item.live]
+        for _ in range(40):
+            x, y = (int(value) for value in rng.integers(-10, 85, size=2))
+            k = [None, 1, 8, 500][int(rng.integers(4))]
+            radius = [None, 0, 5, 30][int(rng.integers(4))]
+            where = [None, lambda item: item.x % 2 == 0][int(rng.integers(2))]
+            assert list(index.nearest(x, y, k, radius, where)) == brute_force_nearest(live, x, y, k, radius, where)
+        # Move some items and retire others, then bring the index up to date.
+        for item in items:
+            if rng.random() < 0.2:
+                item.x, item.y = (int(value) for value in rng.integers(0, 75, size=2))
+            if rng.random() < 0.1:
+                item.live = False
+        index.refresh()
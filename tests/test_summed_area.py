@@ -0,0 +1,20 @@
+import numpy as np
+from summed_area import SummedAreaTable
+
+def slice_count(mask, x0, y0, x1, y1):
+    x0, y0 = max(x0, 0), max(y0, 0)
+    return int(mask[x0:max(x1 + 1, 0), y0:max(y1 + 1, 0)].sum())
+
+def test_counts_match_slice_sums():
+    rng = np.random.default_rng(23)
+    for width, height in ((40, 30), (1, 17), (9, 1)):
+        mask = rng.random((width, height)) < 0.3
+        table = SummedAreaTable(mask)
+        # Corners well past every edge, so windows are clipped, partly or wholly off the
+        # grid, or empty (x0 > x1).
+        x0, x1 = rng.integers(-8, width + 8, size=(2, 500))
+        y0, y1 = rng.integers(-8, height + 8, size=(2, 500))
+        expected = [slice_count(mask, *corners) for corners in zip(x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist())]
+        assert table.counts(x0, y0, x1, y1).tolist() == expected
+        assert [table.count(*corners) for corners in zip(x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist())] == expected
+        assert table.count(-5, -5, width + 5, height + 5) == mask.sum()
@@ -0,0 +1,69 @@
+import numpy as np
+
+# Sight rays follow the rounded points get_effective_sight walks: for a target
+# (dx, dy) steps = max(|dx|, |dy|) away, the cells round(i * dx / steps),
+# round(i * dy / steps) for 0 < i < steps. Those rays do not share prefixes (the ray
+# to a cell is not the ray to its predecessor plus one cell), so instead of sweeping
+# shadows outward the rays of a whole window are gathered at once from a table.
+_RAY_TABLES = {}
+
+def _rays(deltas):
+    """
+    Returns (steps, ray, on_ray) for an (N, 2) array of target offsets: the Chebyshev
+    step count of each target, the (N, L, 2) offsets its ray crosses and an (N, L) mask
+    of the entries that are really on the ray (rays are padded to the longest one).
+    """
+    deltas = np.asarray(deltas, dtype=np.int64).reshape(-1, 2)
+    steps = np.abs(deltas).max(axis=1)
+    length = max(int(steps.max(initial=0)) - 1, 0)
+    i = np.arange(1, length + 1)
+    on_ray = i[None, :] < steps[:, None]
+    safe = np.maximum(steps, 1)[:, None, None]
+    ray = np.rint(i[None, :, None] * deltas[:, None, :] / safe).astype(np.int64)
+    ray[~on_ray] = 0
+    return steps, ray, on_ray
+
+def ray_table(radius):
+    """
+    Offsets of every cell within Chebyshev distance radius (x-major order) with their
+    rays, as _rays returns them. Cached per radius.
+    """
+    table = _RAY_TABLES.get(radius)
+    if table is None:
+        span = np.arange(-radius, radius + 1)
+        offsets = np.stack(np.meshgrid(span, span, indexing="ij"), axis=-1).reshape(-1, 2)
+        table = _RAY_TABLES[radius] = (offsets,) + _rays(offsets)
+    return table
+
+def _max_obstruction(sight, origin, ray, on_ray):
+    if ray.shape[1] == 0:
+        return np.zeros(len(ray), dtype=np.int64)
+    cells = ray + np.asarray(origin)
+    values = sight[cells[..., 0], cells[..., 1]].astype(np.int64)
+    return np.where(on_ray, values, 0).max(axis=1)
+
+def sight_window(sight, origin, radius):
+    """
+    Sight field around origin in one pass: returns (cells, steps, obstruction) for every
+    map cell within Chebyshev distance radius, where obstruction is the highest sight
+    obstruction on the ray from origin to that cell (the cell itself excluded).
+    """
+    offsets, steps, ray, on_ray = ray_table(radius)
+    cells = offsets + np.asarray(origin)
+    inside = ((cells >= 0) & (cells < sight.shape)).all(axis=1)
+    # A ray stays inside the box spanned by its ends, so in-map targets only read the map.
+    return cells[inside], steps[inside], _max_obstruction(sight, origin, ray[inside], on_ray[inside])
+
+def sight_towards(sight, origin, targets):
+    """
+    Like sight_window, for an arbitrary list of target cells: returns (steps, obstruction).
+    """
+    steps, ray, on_ray = _rays(np.asarray(targets) - np.asarray(origin))
+    return steps, _max_obstruction(sight, origin, ray, on_ray)
+
+def base_by_steps(base_sight, sight_distance, max_steps):
+    """
+    Looks the per-distance base table up for 0..max_steps steps (distances past
+    sight_distance use its entry, the observer's own cell is 100).
+    """
+    return np.array([100] + [base_sight.get(min(s, sight_distance), 0) for s in range(1, max_steps + 1)])